@@ -1,11 +1,26 @@
 import os
+import io
+import re
+import stat
+import json
+import struct
+import zlib
 import zipfile
 import time
+import heapq
+import sqlite3
+import itertools
+import uuid
 from pathlib import Path
-from shutil import copy2
+from shutil import copystat, move
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
+import queue
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import collections
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox
 import sys
@@ -21,6 +36,17 @@ try:
 except ImportError:
     rarfile = None
 
+# Optional faster inflate implementations, tried in this order
+def _load_isal():
+    from isal import isal_zlib
+    return isal_zlib
+
+def _load_zlib_ng():
+    from zlib_ng import zlib_ng
+    return zlib_ng
+
+DEFLATE_BACKENDS = (("isal", _load_isal), ("zlib-ng", _load_zlib_ng), ("zlib", lambda: zlib))
+
 
 def get_base_dir():
     if getattr(sys, 'frozen', False):
@@ -30,8 +56,11 @@ def get_base_dir():
         return Path(__file__).parent
 
 CONFIG_FILE = get_base_dir() / "unzipper_config.txt"
+SNAPSHOT_FILE = get_base_dir() / "unzipper_snapshot.json"
+CLEANUP_FILE = get_base_dir() / "unzipper_cleanup.json"
+CATALOG_FILE = get_base_dir() / "unzipper_catalog.db"
 
-def write_config(monitor_folder, dest_folder, delete_after_zip, delete_after_extracted, file_exts, logic_input=None, copy_enabled=None, logic_enabled=None, copy_whole_folder=None):
+def write_config(monitor_folder, dest_folder, delete_after_zip, delete_after_extracted, file_exts, logic_input=None, copy_enabled=None, logic_enabled=None, copy_whole_folder=None, **settings):
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         f.write(f"monitor_folder={monitor_folder}\n")
         f.write(f"dest_folder={dest_folder}\n")
@@ -46,6 +75,10 @@ def write_config(monitor_folder, dest_folder, delete_after_zip, delete_after_ext
             f.write(f"logic_enabled={str(logic_enabled)}\n")
         if copy_whole_folder is not None:
             f.write(f"copy_whole_folder={str(copy_whole_folder)}\n")
+        # Any further settings are written as-is, in the order given
+        for key, value in settings.items():
+            if value is not None:
+                f.write(f"{key}={str(value)}\n")
 
 def read_config():
     config = {}
@@ -93,36 +126,2004 @@ def remove_startup_shortcut():
         return True
     return False
 
-def is_startup_enabled():
-    return os.path.exists(get_startup_shortcut_path())
+def is_startup_enabled():
+    return os.path.exists(get_startup_shortcut_path())
+
+COPY_CHUNK_SIZE = 1024 * 1024
+SCHEDULE_ORDERS = ("fifo", "oldest", "newest", "smallest", "largest", "folder")
+
+def parse_rate_limit(value):
+    """Convert a MB/s setting ("", "0", "2.5") to bytes/sec; 0 means unlimited."""
+    try:
+        mb = float(str(value).strip() or 0)
+    except ValueError:
+        return 0
+    return int(mb * 1024 * 1024) if mb > 0 else 0
+
+def lower_io_priority():
+    """Drop the calling thread to background I/O priority where the OS supports it."""
+    try:
+        if platform.system() == "Windows":
+            import ctypes
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN))
+        if hasattr(os, "setpriority"):
+            # On Linux the I/O scheduler derives the thread's I/O priority from its nice value
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+            return True
+    except Exception:
+        pass
+    return False
+
+class IOGovernor:
+    """Token-bucket bandwidth caps for the reads and writes of one pipeline.
+
+    Limits are in bytes/sec (0 = unlimited) and can be changed at any time
+    from another thread; the next chunk picks up the new rate.
+    """
+    def __init__(self, read_bps=0, write_bps=0):
+        self._lock = threading.Lock()
+        now = time.monotonic()
+        # kind -> [rate, tokens, last refill time]
+        self._buckets = {"read": [0, 0.0, now], "write": [0, 0.0, now]}
+        self.set_limits(read_bps, write_bps)
+
+    def set_limits(self, read_bps=None, write_bps=None):
+        with self._lock:
+            for kind, rate in (("read", read_bps), ("write", write_bps)):
+                if rate is not None:
+                    bucket = self._buckets[kind]
+                    bucket[0] = max(0, int(rate))
+                    bucket[1] = min(bucket[1], float(bucket[0]))
+                    bucket[2] = time.monotonic()
+
+    @property
+    def limits(self):
+        """Current (read, write) caps in bytes/sec."""
+        with self._lock:
+            return self._buckets["read"][0], self._buckets["write"][0]
+
+    def throttle_read(self, nbytes):
+        self._consume("read", nbytes)
+
+    def throttle_write(self, nbytes):
+        self._consume("write", nbytes)
+
+    def _consume(self, kind, nbytes):
+        with self._lock:
+            bucket = self._buckets[kind]
+            rate = bucket[0]
+            if not rate:
+                return
+            now = time.monotonic()
+            # Allow at most one second of burst, and go into debt for large chunks
+            bucket[1] = min(float(rate), bucket[1] + (now - bucket[2]) * rate) - nbytes
+            bucket[2] = now
+            wait = -bucket[1] / rate if bucket[1] < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+def available_deflate_backends():
+    """Return {name: module} for every inflate backend importable here."""
+    found = {}
+    for name, loader in DEFLATE_BACKENDS:
+        try:
+            found[name] = loader()
+        except ImportError:
+            continue
+    return found
+
+def get_deflate_backend(preferred="auto"):
+    """Pick the requested backend if installed, else the fastest one available (stdlib zlib last)."""
+    found = available_deflate_backends()
+    if preferred in found:
+        return preferred, found[preferred]
+    for name, _ in DEFLATE_BACKENDS:
+        if name in found:
+            return name, found[name]
+    return "zlib", zlib
+
+class InflateReader(io.RawIOBase):
+    """Inflates a ZIP_DEFLATED member straight from the archive with a chosen backend.
+
+    The member's raw data is located from its local header, decompressed
+    with ``backend.decompressobj`` and CRC-checked at the end, exactly as
+    ZipFile.open() would with the stdlib zlib.
+    """
+    CHUNK = 64 * 1024
+
+    def __init__(self, archive_path, info, backend):
+        super().__init__()
+        self.info = info
+        self._fp = open(archive_path, "rb")
+        try:
+            self._fp.seek(info.header_offset)
+            header = self._fp.read(30)
+            if len(header) != 30 or header[:4] != b"PK\x03\x04":
+                raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            self._fp.seek(name_len + extra_len, os.SEEK_CUR)
+        except Exception:
+            self._fp.close()
+            raise
+        self._remaining = info.compress_size
+        self._inflater = backend.decompressobj(-15)
+        self._crc32 = getattr(backend, "crc32", zlib.crc32)
+        self._crc = 0
+        self._pending = b""
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def _inflate(self, max_length):
+        if self._inflater.unconsumed_tail:
+            return self._inflater.decompress(self._inflater.unconsumed_tail, max_length)
+        if self._remaining:
+            raw = self._fp.read(min(self.CHUNK, self._remaining))
+            if not raw:
+                raise EOFError(f"Truncated data for {self.info.filename}")
+            self._remaining -= len(raw)
+            return self._inflater.decompress(raw, max_length)
+        self._done = True
+        out = self._inflater.flush()
+        if self._crc32(out, self._crc) != self.info.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {self.info.filename!r}")
+        return out
+
+    def readinto(self, b):
+        while not self._pending and not self._done:
+            self._pending = self._inflate(len(b))
+            self._crc = self._crc32(self._pending, self._crc)
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._fp.close()
+        super().close()
+
+def benchmark_deflate_backends(paths):
+    """Inflate every deflated member of the given ZIPs with each backend.
+
+    Returns {backend: (seconds, uncompressed bytes)} so backends can be
+    compared on the same corpus.
+    """
+    archives = []
+    for path in paths:
+        path = Path(path)
+        archives.extend(sorted(path.glob("*.zip")) if path.is_dir() else [path])
+    results = {}
+    buf = bytearray(COPY_CHUNK_SIZE)
+    for name, module in available_deflate_backends().items():
+        total = 0
+        start = time.perf_counter()
+        for archive in archives:
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    if info.compress_type != zipfile.ZIP_DEFLATED or info.flag_bits & 0x1:
+                        continue
+                    with InflateReader(archive, info, module) as reader:
+                        while True:
+                            n = reader.readinto(buf)
+                            if not n:
+                                break
+                            total += n
+        results[name] = (time.perf_counter() - start, total)
+    return results
+
+def current_rss():
+    """Resident memory of this process in bytes (0 if it cannot be read)."""
+    try:
+        if platform.system() == "Windows":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return 0
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+class MemoryLimitExceeded(Exception):
+    pass
+
+class JobCancelled(Exception):
+    """Raised from a job's read/write loops once its stop_event is set."""
+
+class _AnyEvent:
+    """Stop event for a job that more than one thing can stop: set once any of ``events`` is."""
+    def __init__(self, *events):
+        self.events = [event for event in events if event is not None]
+
+    def is_set(self):
+        return any(event.is_set() for event in self.events)
+
+class MemoryWatch:
+    """Samples RSS at most every ``interval`` seconds, tracking the peak of the current job.
+
+    Both the peak and ``limit`` count only the growth since reset(), so the
+    memory the rest of the app (GUI, earlier jobs) already holds does not
+    count against a job.
+    """
+    def __init__(self, limit=0, interval=0.5):
+        self.limit = int(limit or 0)
+        self.interval = interval
+        self.peak = 0
+        self.baseline = 0
+        self._last = 0.0
+
+    def reset(self):
+        self.peak = 0
+        self.baseline = current_rss()
+        self._last = 0.0
+
+    def sample(self):
+        """Bytes of resident memory gained since reset()."""
+        self._last = time.monotonic()
+        grown = max(0, current_rss() - self.baseline)
+        self.peak = max(self.peak, grown)
+        return grown
+
+    def check(self):
+        if time.monotonic() - self._last < self.interval:
+            return
+        grown = self.sample()
+        if self.limit and grown > self.limit:
+            raise MemoryLimitExceeded(f"memory ceiling of {self.limit // (1024 * 1024)} MB exceeded ({grown // (1024 * 1024)} MB more than when the job started)")
+
+class ByteProgress:
+    """Bytes done out of a known total for one phase of a job, reported at most every ``interval`` seconds.
+
+    ``emit(done, total, rate)`` gets the rate in bytes/sec since the
+    previous report. add() may be called from several threads.
+    """
+    def __init__(self, emit, total, interval=0.25):
+        self.emit = emit
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self._lock = threading.Lock()
+        self._start = self._last = time.monotonic()
+        self._last_done = 0
+
+    def add(self, nbytes):
+        with self._lock:
+            self.done += nbytes
+            now = time.monotonic()
+            if now - self._last < self.interval:
+                return
+            rate = (self.done - self._last_done) / (now - self._last)
+            self._last, self._last_done = now, self.done
+            done = self.done
+        self.emit(done, self.total, rate)
+
+    def finish(self):
+        with self._lock:
+            rate = self.done / max(time.monotonic() - self._start, 1e-9)
+            done = self.done
+        self.emit(done, self.total, rate)
+
+class _WriterLane:
+    """One writer thread and the files routed to it."""
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.files = {}
+        self.batch = []
+        self.open_closed = collections.deque()
+        self.thread = None
+
+class DestinationWriter:
+    """Writer stage for the destination folder.
+
+    Producers hand chunks to background threads that write them through
+    large buffers into temporary ``.unzipper-part`` files. Each file sticks
+    to one writer thread (``workers`` of them), so its chunks stay in order.
+    Bytes in flight are bounded across all of them, so a slow destination
+    blocks the producers instead of growing memory. publish() fsyncs the
+    whole batch (one archive) at once and then moves every file to its final
+    name. Temp names are unique to this writer and publishing never
+    overwrites, so writers sharing a destination (other jobs, processes or
+    instances) cannot clobber each other: a name taken meanwhile gets the
+    next "_1", "_2" suffix instead.
+    """
+    TEMP_SUFFIX = ".unzipper-part"
+
+    def __init__(self, governor=None, max_in_flight=64 * 1024 * 1024, buffer_size=COPY_CHUNK_SIZE, max_open_files=256, workers=1,
+                 low_priority=False):
+        self.governor = governor
+        self.low_priority = low_priority
+        self.max_in_flight = max_in_flight
+        self.buffer_size = buffer_size
+        self.max_open_files = max(1, max_open_files // max(1, workers))
+        self._lanes = [_WriterLane() for _ in range(max(1, workers))]
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._ids = itertools.count()
+        self._reserved = set()
+        self._token = uuid.uuid4().hex[:12]
+        self._stopped = False
+        # Set while abort() runs, so queued chunks are dropped instead of written
+        self._aborting = False
+        self.stall_time = 0.0
+        self.write_time = 0.0
+
+    def _lane(self, file_id):
+        return self._lanes[file_id % len(self._lanes)]
+
+    def reserve(self, final_path):
+        """Claim a final name for this batch; False if already taken."""
+        final_path = Path(final_path)
+        with self._cond:
+            if final_path in self._reserved or final_path.exists():
+                return False
+            self._reserved.add(final_path)
+            return True
+
+    def open(self, final_path, src=None):
+        final_path = Path(final_path)
+        with self._cond:
+            if self._stopped:
+                raise JobCancelled(f"destination writer stopped before {final_path.name}")
+            file_id = next(self._ids)
+            self._reserved.add(final_path)
+            lane = self._lane(file_id)
+            if lane.thread is None:
+                lane.thread = threading.Thread(target=self._run, args=(lane,), daemon=True)
+                lane.thread.start()
+            lane.queue.put(("open", file_id, (final_path, src)))
+        return file_id
+
+    def write(self, file_id, data):
+        size = len(data)
+        with self._cond:
+            if self._in_flight and self._in_flight + size > self.max_in_flight:
+                started = time.monotonic()
+                while self._in_flight and self._in_flight + size > self.max_in_flight and not self._stopped:
+                    self._cond.wait()
+                self.stall_time += time.monotonic() - started
+            # Queued under the lock, so nothing is queued behind a lane's "stop"
+            if self._stopped:
+                raise JobCancelled("destination writer stopped")
+            self._in_flight += size
+            self._lane(file_id).queue.put(("write", file_id, data))
+
+    def close(self, file_id):
+        self._lane(file_id).queue.put(("close", file_id, None))
+
+    def discard(self, file_id):
+        self._lane(file_id).queue.put(("discard", file_id, None))
+
+    def publish(self):
+        """Flush, fsync and rename everything written since the last publish.
+
+        Returns a list of (src, final_path, error) tuples, error being None on
+        success. Once the writer is stopped nothing is published and the
+        list is empty.
+        """
+        started = time.monotonic()
+        waits = []
+        with self._cond:
+            if self._stopped:
+                return []
+            for lane in self._lanes:
+                if lane.thread is not None:
+                    done = threading.Event()
+                    box = []
+                    lane.queue.put(("publish", None, (done, box)))
+                    waits.append((done, box))
+        results = []
+        for done, box in waits:
+            done.wait()
+            if box:
+                results.extend(box[0])
+        with self._cond:
+            self._reserved.clear()
+        # Make the renames themselves durable (no-op where directories cannot be opened)
+        if hasattr(os, "O_DIRECTORY"):
+            for folder in {final.parent for _, final, error in results if error is None}:
+                try:
+                    fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+        with self._cond:
+            self.write_time += time.monotonic() - started
+        return results
+
+    def drain(self, stop_event=None):
+        """Wait until every queued chunk is written; False if stop_event was set first."""
+        with self._cond:
+            while self._in_flight and not self._stopped:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                self._cond.wait(0.1)
+        return not (stop_event is not None and stop_event.is_set())
+
+    def abort(self):
+        """Discard everything written since the last publish; nothing is renamed into place."""
+        waits = []
+        with self._cond:
+            if self._stopped:
+                return
+            self._aborting = True
+            for lane in self._lanes:
+                if lane.thread is not None:
+                    done = threading.Event()
+                    lane.queue.put(("abort", None, done))
+                    waits.append(done)
+        for done in waits:
+            done.wait()
+        with self._cond:
+            self._aborting = False
+            self._reserved.clear()
+
+    def take_stats(self):
+        """Return and reset (seconds producers waited, seconds spent writing)."""
+        with self._cond:
+            stats = (self.stall_time, self.write_time)
+            self.stall_time = 0.0
+            self.write_time = 0.0
+        return stats
+
+    def stop(self):
+        """Shut the writer threads down; unpublished files are discarded.
+
+        Producers still running get JobCancelled from open() and write(),
+        and publish() returns at once, so a job cannot block on a stopped
+        writer.
+        """
+        with self._cond:
+            self._stopped = True
+            for lane in self._lanes:
+                if lane.thread is not None:
+                    lane.queue.put(("stop", None, None))
+            self._cond.notify_all()
+
+    def _run(self, lane):
+        if self.low_priority:
+            lower_io_priority()
+        while True:
+            op, file_id, payload = lane.queue.get()
+            if op == "stop":
+                self._op_abort(lane)
+                return
+            try:
+                if op == "open":
+                    self._op_open(lane, file_id, *payload)
+                elif op == "write":
+                    self._op_write(lane, file_id, payload)
+                elif op == "close":
+                    self._op_close(lane, file_id)
+                elif op == "discard":
+                    self._op_discard(lane, file_id)
+                elif op == "publish":
+                    payload[1].append(self._op_publish(lane))
+                    payload[0].set()
+                elif op == "abort":
+                    self._op_abort(lane)
+                    payload.set()
+            except Exception:
+                if op == "publish":
+                    payload[0].set()
+                elif op == "abort":
+                    payload.set()
+
+    def _op_open(self, lane, file_id, final_path, src):
+        temp = final_path.with_name(f"{final_path.name}.{self._token}-{file_id}{self.TEMP_SUFFIX}")
+        state = {"final": final_path, "temp": temp,
+                 "src": src, "fh": None, "error": None}
+        try:
+            state["fh"] = open(state["temp"], "wb", buffering=self.buffer_size)
+        except Exception as e:
+            state["error"] = e
+        lane.files[file_id] = state
+        lane.batch.append(file_id)
+
+    def _op_write(self, lane, file_id, data):
+        state = lane.files.get(file_id)
+        try:
+            if state is not None and state["fh"] is not None and state["error"] is None and not self._aborting:
+                started = time.monotonic()
+                state["fh"].write(data)
+                if self.governor is not None:
+                    self.governor.throttle_write(len(data))
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self.write_time += elapsed
+        except Exception as e:
+            if state is not None:
+                state["error"] = e
+        finally:
+            with self._cond:
+                self._in_flight -= len(data)
+                self._cond.notify_all()
+
+    def _op_close(self, lane, file_id):
+        state = lane.files.get(file_id)
+        if state is None:
+            return
+        try:
+            if state["fh"] is not None:
+                state["fh"].flush()
+        except Exception as e:
+            state["error"] = state["error"] or e
+        # Keep a bounded number of handles open for the batched fsync
+        if state["fh"] is not None:
+            lane.open_closed.append(file_id)
+        while len(lane.open_closed) > self.max_open_files:
+            oldest = lane.files.get(lane.open_closed.popleft())
+            if oldest is not None and oldest["fh"] is not None:
+                self._sync_and_close(oldest)
+
+    def _op_discard(self, lane, file_id):
+        state = lane.files.pop(file_id, None)
+        if state is None:
+            return
+        lane.batch.remove(file_id)
+        if state["fh"] is not None:
+            try:
+                state["fh"].close()
+            except Exception:
+                pass
+        try:
+            state["temp"].unlink()
+        except OSError:
+            pass
+
+    def _op_abort(self, lane):
+        for file_id in list(lane.batch):
+            self._op_discard(lane, file_id)
+        lane.open_closed.clear()
+
+    def _sync_and_close(self, state):
+        try:
+            state["fh"].flush()
+            os.fsync(state["fh"].fileno())
+        except Exception as e:
+            state["error"] = state["error"] or e
+        finally:
+            try:
+                state["fh"].close()
+            except Exception:
+                pass
+            state["fh"] = None
+
+    def _op_publish(self, lane):
+        results = []
+        batch, lane.batch = lane.batch, []
+        lane.open_closed.clear()
+        for file_id in batch:
+            state = lane.files[file_id]
+            if state["fh"] is not None:
+                self._sync_and_close(state)
+        for file_id in batch:
+            state = lane.files.pop(file_id)
+            error = state["error"]
+            if error is None:
+                try:
+                    if state["src"] is not None:
+                        copystat(state["src"], state["temp"])
+                    state["final"] = self._place(state["temp"], state["final"])
+                except Exception as e:
+                    error = e
+            if error is not None:
+                try:
+                    state["temp"].unlink()
+                except OSError:
+                    pass
+            results.append((state["src"], state["final"], error))
+        return results
+
+    @staticmethod
+    def _place(temp, final):
+        """Move a finished temp file to ``final`` or, if that name is taken, the next free "_N" name."""
+        counter = 0
+        while True:
+            target = final if counter == 0 else final.with_name(f"{final.stem}_{counter}{final.suffix}")
+            counter += 1
+            try:
+                # A hard link fails instead of replacing an existing file
+                os.link(temp, target)
+            except FileExistsError:
+                continue
+            except (OSError, NotImplementedError):
+                # No hard links on this file system: claim the name first, then fill it
+                try:
+                    fd = os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    continue
+                os.close(fd)
+                os.replace(temp, target)
+                return target
+            os.unlink(temp)
+            return target
+
+def archive_sort_key(path, order):
+    """Sort key placing the archive that should be processed first lowest."""
+    path = Path(path)
+    if order == "folder":
+        return (str(path.parent).lower(), path.name.lower())
+    try:
+        st = path.stat()
+    except OSError:
+        return (0,)
+    if order == "oldest":
+        return (st.st_mtime,)
+    if order == "newest":
+        return (-st.st_mtime,)
+    if order == "smallest":
+        return (st.st_size,)
+    if order == "largest":
+        return (-st.st_size,)
+    return (0,)
+
+class ArchiveScheduler:
+    """Single worker thread draining a priority queue of archive jobs."""
+    def __init__(self, process, order="fifo", low_priority=False):
+        self.process = process
+        self.order = order if order in SCHEDULE_ORDERS else "fifo"
+        self.low_priority = low_priority
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def submit(self, path):
+        with self._cond:
+            heapq.heappush(self._heap, (archive_sort_key(path, self.order), next(self._seq), path))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def set_order(self, order):
+        with self._cond:
+            self.order = order if order in SCHEDULE_ORDERS else "fifo"
+            self._heap = [(archive_sort_key(path, self.order), seq, path) for _, seq, path in self._heap]
+            heapq.heapify(self._heap)
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def stop(self):
+        """Stop after the current job; returns the paths still queued, which are dropped."""
+        with self._cond:
+            self._stopped = True
+            dropped = [path for _, _, path in self._heap]
+            self._heap.clear()
+            self._cond.notify_all()
+        return dropped
+
+    def _run(self):
+        if self.low_priority:
+            lower_io_priority()
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                _, _, path = heapq.heappop(self._heap)
+            try:
+                self.process(path)
+            except Exception:
+                pass
+
+class CleanupQueue:
+    """Deferred deletion of archives and extracted folders.
+
+    The path is first renamed to a tombstone name next to it, which frees
+    the original name at once and keeps the watcher from picking it up
+    again. The tombstone is written to CLEANUP_FILE and removed later by one
+    low-priority thread, in batches, retrying files that antivirus or
+    indexers keep locked. Deletions still pending at exit resume on the
+    next start.
+    """
+    TOMBSTONE = ".unzipper-delete"
+
+    def __init__(self, path=CLEANUP_FILE, batch_size=500, max_attempts=20):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.log = print
+        self._cond = threading.Condition()
+        self._tasks = self._load()
+        # tombstone path -> log callback of the job that queued it (not persisted)
+        self._logs = {}
+        self._thread = None
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                tasks = json.load(f)
+            return [t for t in tasks if isinstance(t, dict) and "path" in t]
+        except (OSError, ValueError):
+            return []
+
+    def _save(self):
+        # Called with the lock held
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._tasks, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def pending(self):
+        with self._cond:
+            return len(self._tasks)
+
+    def enqueue(self, target, label="file", log=None):
+        """Queue a file or folder for deletion; returns the path it will be deleted from.
+
+        The outcome is reported to ``log`` if given, otherwise to ``self.log``.
+        """
+        target = Path(target)
+        tombstone = target.with_name(f"{target.name}{self.TOMBSTONE}-{time.time_ns()}")
+        try:
+            os.rename(target, tombstone)
+        except OSError:
+            tombstone = target  # e.g. locked: delete it in place later
+        with self._cond:
+            self._tasks.append({"path": str(tombstone), "label": label, "attempts": 0, "due": 0})
+            if log is not None:
+                self._logs[str(tombstone)] = log
+            self._save()
+            self._cond.notify()
+        self.start()
+        return tombstone
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        lower_io_priority()
+        while True:
+            with self._cond:
+                while True:
+                    now = time.time()
+                    due = [t for t in self._tasks if t["due"] <= now]
+                    if due:
+                        task = due[0]
+                        break
+                    wait = min((t["due"] for t in self._tasks), default=now + 3600) - now
+                    self._cond.wait(max(wait, 0.1))
+            done, error = self._remove(Path(task["path"]))
+            with self._cond:
+                log = self._logs.get(task["path"], self.log)
+                if done or task["attempts"] + 1 >= self.max_attempts:
+                    self._tasks.remove(task)
+                    self._logs.pop(task["path"], None)
+                else:
+                    task["attempts"] += 1
+                    task["due"] = time.time() + min(300, 2 ** task["attempts"])
+                self._save()
+            if done:
+                log(f"Deleted {task['label']}: {task['path']}")
+            elif task not in self._tasks:
+                log(f"Giving up deleting {task['label']} after {self.max_attempts} attempts: {task['path']} ({error})")
+
+    def _remove(self, path):
+        """Delete a file or tree; returns (finished, last error)."""
+        if not os.path.lexists(path):
+            return True, None
+        if not path.is_dir() or path.is_symlink():
+            return self._remove_file(path)
+        error = None
+        removed = 0
+        for root, dirs, files in os.walk(path, topdown=False):
+            for name in files:
+                ok, err = self._remove_file(Path(root) / name)
+                error = err or error
+                removed += 1
+                if removed % self.batch_size == 0:
+                    time.sleep(0)  # let foreground work run between batches
+            for name in dirs:
+                full = Path(root) / name
+                try:
+                    if full.is_symlink():
+                        full.unlink()
+                    else:
+                        full.rmdir()
+                except OSError as e:
+                    error = e
+        try:
+            path.rmdir()
+        except OSError as e:
+            return False, e
+        return error is None, error
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            path.unlink()
+            return True, None
+        except FileNotFoundError:
+            return True, None
+        except PermissionError as e:
+            # Read-only files (common on Windows) need their flag cleared first
+            try:
+                os.chmod(path, stat.S_IWRITE)
+                path.unlink()
+                return True, None
+            except OSError:
+                return False, e
+        except OSError as e:
+            return False, e
+
+_cleanup_queue = None
+
+def get_cleanup_queue():
+    """The process-wide cleanup queue (created, with its persisted tasks, on first use)."""
+    global _cleanup_queue
+    if _cleanup_queue is None:
+        _cleanup_queue = CleanupQueue()
+    return _cleanup_queue
+
+CatalogHit = collections.namedtuple("CatalogHit", "name size crc dest archive processed")
+
+class ArchiveCatalog:
+    """SQLite index of every member of every processed archive.
+
+    Member names get an FTS5 trigram index when this SQLite build has
+    one, so substring searches stay fast on large catalogs; otherwise
+    searches fall back to a LIKE scan. Safe to share between threads, and
+    between processes (worker processes write to the same file).
+
+    An archive is identified by its path together with its size and mtime,
+    so a different download that later arrives under the same name gets
+    an entry of its own instead of replacing the earlier one.
+    """
+    def __init__(self, path=CATALOG_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA foreign_keys=ON")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS archives ("
+                "id INTEGER PRIMARY KEY, path TEXT NOT NULL, name TEXT NOT NULL, size INTEGER, mtime_ns INTEGER, "
+                "processed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS members ("
+                "id INTEGER PRIMARY KEY, archive_id INTEGER NOT NULL REFERENCES archives(id) ON DELETE CASCADE, "
+                "name TEXT NOT NULL, size INTEGER, crc INTEGER, dest TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS members_archive ON members(archive_id)")
+        self._migrate()
+        with self._lock, self._db:
+            self._db.execute("CREATE INDEX IF NOT EXISTS archives_path ON archives(path)")
+            try:
+                self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(name, tokenize='trigram')")
+                self.full_text = True
+            except sqlite3.OperationalError:
+                self.full_text = False
+
+    def _migrate(self):
+        # Catalogs written before archives had a size/mtime kept one UNIQUE row per path
+        with self._lock:
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(archives)")}
+            if "mtime_ns" in columns:
+                return
+            # The documented table rebuild; foreign keys are off so members survive the DROP
+            self._db.execute("PRAGMA foreign_keys=OFF")
+            try:
+                with self._db:
+                    self._db.execute(
+                        "CREATE TABLE archives_new ("
+                        "id INTEGER PRIMARY KEY, path TEXT NOT NULL, name TEXT NOT NULL, size INTEGER, mtime_ns INTEGER, "
+                        "processed REAL NOT NULL)"
+                    )
+                    self._db.execute("INSERT INTO archives_new (id, path, name, processed) SELECT id, path, name, processed FROM archives")
+                    self._db.execute("DROP TABLE archives")
+                    self._db.execute("ALTER TABLE archives_new RENAME TO archives")
+            finally:
+                self._db.execute("PRAGMA foreign_keys=ON")
+
+    @staticmethod
+    def signature(archive_path):
+        """(size, mtime_ns) of an archive, or (None, None) if it cannot be read; take it before the archive is deleted."""
+        try:
+            st = os.stat(archive_path)
+        except OSError:
+            return None, None
+        return st.st_size, st.st_mtime_ns
+
+    def record(self, archive_path, members, signature=None):
+        """Add ``(name, size, crc, dest)`` rows for an archive.
+
+        Only an entry for the very same file (same path, size and mtime, as
+        given by ``signature`` or read now) is replaced.
+        """
+        archive_path = Path(archive_path)
+        key = os.path.abspath(archive_path)
+        size, mtime_ns = signature or self.signature(archive_path)
+        with self._lock, self._db:
+            same_file = self._db.execute(
+                "SELECT id FROM archives WHERE path = ? AND size IS ? AND mtime_ns IS ?", (key, size, mtime_ns)
+            ).fetchall()
+            for row in same_file:
+                if self.full_text:
+                    self._db.execute("DELETE FROM members_fts WHERE rowid IN (SELECT id FROM members WHERE archive_id = ?)", row)
+                self._db.execute("DELETE FROM archives WHERE id = ?", row)
+            archive_id = self._db.execute(
+                "INSERT INTO archives (path, name, size, mtime_ns, processed) VALUES (?, ?, ?, ?, ?)",
+                (key, archive_path.name, size, mtime_ns, time.time())
+            ).lastrowid
+            rows = [(archive_id, name, size, crc, None if dest is None else str(dest)) for name, size, crc, dest in members]
+            self._db.executemany("INSERT INTO members (archive_id, name, size, crc, dest) VALUES (?, ?, ?, ?, ?)", rows)
+            if self.full_text:
+                self._db.execute("INSERT INTO members_fts (rowid, name) SELECT id, name FROM members WHERE archive_id = ?", (archive_id,))
+        return len(rows)
+
+    def search(self, query, limit=100):
+        """Members whose path contains every whitespace-separated term of ``query`` (case-insensitive)."""
+        terms = query.split()
+        if not terms:
+            return []
+        # Trigram phrases match substrings of three or more characters; shorter terms use LIKE
+        indexed = [term for term in terms if len(term) >= 3] if self.full_text else []
+        scanned = [term for term in terms if term not in indexed]
+        clauses, params = [], []
+        if indexed:
+            clauses.append("m.id IN (SELECT rowid FROM members_fts WHERE members_fts MATCH ?)")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in indexed))
+        for term in scanned:
+            clauses.append("m.name LIKE ? ESCAPE '\\'")
+            params.append("%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        sql = ("SELECT m.name, m.size, m.crc, m.dest, a.path, a.processed FROM members m "
+               "JOIN archives a ON a.id = m.archive_id "
+               f"WHERE {' AND '.join(clauses)} ORDER BY a.processed DESC, m.name LIMIT ?")
+        with self._lock:
+            return [CatalogHit(*row) for row in self._db.execute(sql, (*params, limit))]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class InFlightRegistry:
+    """Archives currently queued or being extracted, keyed by resolved path.
+
+    Shared by every pipeline watching the same folder so an archive is only
+    ever handled by one job at a time.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = set()
+        self.suppressed = 0
+
+    @staticmethod
+    def key(path):
+        try:
+            return os.path.normcase(str(Path(path).resolve()))
+        except OSError:
+            return os.path.normcase(os.path.abspath(str(path)))
+
+    def claim(self, path):
+        key = self.key(path)
+        with self._lock:
+            if key in self._paths:
+                self.suppressed += 1
+                return False
+            self._paths.add(key)
+            return True
+
+    def release(self, path):
+        with self._lock:
+            self._paths.discard(self.key(path))
+
+class LeaseManager:
+    """Cooperative claims on the archives of a folder shared by several Unzipper instances.
+
+    A lease is a file in ``.unzipper_leases`` created with O_EXCL, so only
+    one instance can hold it; the holder touches it every few seconds as a
+    heartbeat. Instances that lose a claim watch the lease, and if its
+    mtime stops changing for ``ttl`` seconds (measured on their own clock,
+    so clock skew between machines does not matter) they take it over by
+    renaming it away, which only one of them can do, and claim the archive
+    themselves. A finished archive leaves a ``.done`` marker holding its
+    size and mtime, so no instance processes the same download twice.
+    Every heartbeat first checks the lease is still the file this instance
+    created; if it was taken over, or cannot be touched for half the ttl,
+    the lease counts as lost and the claim's ``on_lost`` callback runs so
+    its job can be cancelled.
+    """
+    FOLDER = ".unzipper_leases"
+
+    def __init__(self, folder, instance_id=None, ttl=60):
+        self.folder = Path(folder) / self.FOLDER
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.instance_id = instance_id or f"{platform.node()}-{os.getpid()}"
+        self.ttl = float(ttl)
+        self.log = print
+        self._lock = threading.Lock()
+        # archive name -> [archive path, lease inode, on_lost callback, last successful heartbeat]
+        self._held = {}
+        # archive name -> [archive path, callback, lease mtime seen, when it was seen]
+        self._watched = {}
+        self._closed = threading.Event()
+        self.prune()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="unzipper-leases")
+        self._thread.start()
+
+    def _lease(self, name):
+        return self.folder / (name + ".lease")
+
+    def _marker(self, name):
+        return self.folder / (name + ".done")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def owner(self, archive_path):
+        record = self._read(self._lease(Path(archive_path).name))
+        return record.get("instance") if record else None
+
+    def is_done(self, archive_path):
+        """Whether some instance already finished this archive (the same size and mtime as now)."""
+        marker = self._read(self._marker(Path(archive_path).name))
+        return marker is not None and marker.get("signature") == self._signature(archive_path)
+
+    def claim(self, archive_path, on_lost=None):
+        """Try to take the lease on an archive; True if this instance now holds it.
+
+        ``on_lost(archive_path)`` is called from the heartbeat thread if the
+        lease is later lost to another instance.
+        """
+        name = Path(archive_path).name
+        lease = self._lease(name)
+        for _ in range(2):
+            try:
+                fd = os.open(lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                record = self._read(lease)
+                # A lease left by an earlier run of this same instance can be taken back at once
+                if record is None or record.get("instance") != self.instance_id or name in self._held:
+                    return False
+                if not self._take_over(name):
+                    return False
+                continue
+            inode = os.fstat(fd).st_ino
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"instance": self.instance_id, "host": platform.node(), "pid": os.getpid(), "claimed": time.time()}, f)
+            with self._lock:
+                self._held[name] = [Path(archive_path), inode, on_lost, time.monotonic()]
+                self._watched.pop(name, None)
+            return True
+        return False
+
+    def _take_over(self, name, expected_mtime=None):
+        lease = self._lease(name)
+        grabbed = self.folder / f"{name}.{self.instance_id}.{os.getpid()}.stale"
+        try:
+            if expected_mtime is not None and os.stat(lease).st_mtime_ns != expected_mtime:
+                return False
+            # Of several instances renaming the same lease, exactly one succeeds
+            os.rename(lease, grabbed)
+        except OSError:
+            return False
+        try:
+            if expected_mtime is not None and os.stat(grabbed).st_mtime_ns != expected_mtime:
+                # The holder came back to life between the check and the rename
+                os.rename(grabbed, lease)
+                return False
+            os.remove(grabbed)
+        except OSError:
+            pass
+        return True
+
+    def release(self, archive_path, done=False):
+        """Give up a lease, first leaving a done marker if the archive was processed."""
+        name = Path(archive_path).name
+        if done:
+            marker = self._marker(name)
+            tmp = marker.with_name(f"{marker.name}.{self.instance_id}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"instance": self.instance_id, "signature": self._signature(archive_path), "finished": time.time()}, f)
+            os.replace(tmp, marker)
+        with self._lock:
+            self._held.pop(name, None)
+        lease = self._lease(name)
+        record = self._read(lease)
+        if record is not None and record.get("instance") == self.instance_id:
+            try:
+                os.remove(lease)
+            except OSError:
+                pass
+
+    def watch(self, archive_path, callback):
+        """Call ``callback(archive_path)`` if another instance's lease on it is released unfinished or expires."""
+        name = Path(archive_path).name
+        with self._lock:
+            if name not in self._held:
+                self._watched[name] = [Path(archive_path), callback, None, time.monotonic()]
+
+    def unwatch(self, callback):
+        with self._lock:
+            for name in [name for name, entry in self._watched.items() if entry[1] == callback]:
+                del self._watched[name]
+
+    def _run(self):
+        interval = min(1.0, self.ttl / 4)
+        while not self._closed.wait(interval):
+            with self._lock:
+                held = list(self._held.items())
+                watched = list(self._watched.items())
+            for name, entry in held:
+                self._heartbeat(name, entry)
+            for name, entry in watched:
+                self._check(name, entry)
+
+    def _heartbeat(self, name, entry):
+        path, inode, on_lost, last_ok = entry
+        lease = self._lease(name)
+        now = time.monotonic()
+        try:
+            # Never touch a lease another instance has created since taking ours over
+            taken = os.stat(lease).st_ino != inode
+            record = self._read(lease)
+            taken = taken or (record is not None and record.get("instance") != self.instance_id)
+            if not taken:
+                os.utime(lease)
+                entry[3] = now
+                return
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # A network share hiccup; other instances only take over after a full ttl
+            if now - last_ok < self.ttl / 2:
+                return
+        with self._lock:
+            if self._held.get(name) is not entry:
+                return
+            del self._held[name]
+        self.log(f"Lost the lease on {name} to another instance; stopping its job.")
+        if on_lost is not None:
+            on_lost(path)
+
+    def _check(self, name, entry):
+        path, callback, seen_mtime, seen_at = entry
+        lease = self._lease(name)
+        try:
+            mtime = os.stat(lease).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        except OSError:
+            return
+        if mtime is not None:
+            now = time.monotonic()
+            if mtime != seen_mtime:
+                entry[2], entry[3] = mtime, now
+                return
+            if now - seen_at < self.ttl:
+                return
+            holder = self._read(lease) or {}
+            if not self._take_over(name, expected_mtime=mtime):
+                entry[3] = now
+                return
+            self.log(f"Lease on {name} held by {holder.get('instance', 'another instance')} expired; taking it over.")
+        with self._lock:
+            if self._watched.get(name) is not entry:
+                return
+            del self._watched[name]
+        if path.exists() and not self.is_done(path):
+            callback(path)
+
+    def prune(self, max_age=24 * 3600):
+        """Remove done markers of archives that are gone, and leftovers of interrupted takeovers."""
+        now = time.time()
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                age = now - entry.stat().st_mtime
+                if entry.name.endswith((".stale", ".tmp")) and age > self.ttl:
+                    os.remove(entry.path)
+                elif entry.name.endswith(".done") and age > max_age and not (self.folder.parent / entry.name[:-5]).exists():
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Stop heartbeats and give up every lease still held, so other instances can take over at once."""
+        self._closed.set()
+        self._thread.join(timeout=5)
+        with self._lock:
+            held = [entry[0] for entry in self._held.values()]
+        for path in held:
+            self.release(path)
+
+class EventCoalescer:
+    """Merges bursts of created/moved/modified events for the same file.
+
+    A path is passed to ``submit(path, events)`` once ``window`` seconds go
+    by without another event for it; the extra events are counted as
+    suppressed.
+    """
+    def __init__(self, submit, window=1.0):
+        self.submit = submit
+        self.window = window
+        self.suppressed = 0
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def notify(self, path):
+        key = InFlightRegistry.key(path)
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [Path(path), time.monotonic() + self.window, 1]
+            else:
+                # Later events win (e.g. the rename target), and restart the quiet period
+                entry[0] = Path(path)
+                entry[1] = time.monotonic() + self.window
+                entry[2] += 1
+                self.suppressed += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    due = [key for key, entry in self._pending.items() if entry[1] <= now]
+                    if due:
+                        break
+                    wait = min((entry[1] for entry in self._pending.values()), default=now + 60) - now
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                ready = [self._pending.pop(key) for key in due]
+            for path, _, events in ready:
+                try:
+                    self.submit(path, events)
+                except Exception:
+                    pass
+
+class DirectorySnapshot:
+    """Persisted listing of the archives in a monitored folder.
+
+    Each archive is recorded as name -> [size, mtime_ns, inode] once it has
+    been handled. At startup a fresh os.scandir() listing is diffed against
+    it, so only archives that are new or changed since then are enqueued.
+    """
+    SAVE_INTERVAL = 2.0
+
+    def __init__(self, folder, archive_exts, path=SNAPSHOT_FILE):
+        self.folder = Path(folder)
+        self.archive_exts = archive_exts
+        self.path = Path(path)
+        self.key = os.path.normcase(os.path.abspath(str(folder)))
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.entries = self._load_all().get(self.key)
+
+    def _load_all(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def scan(self):
+        current = {}
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if Path(entry.name).suffix.lower() not in self.archive_exts:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    current[entry.name] = [st.st_size, st.st_mtime_ns, entry.inode()]
+                except OSError:
+                    continue
+        return current
+
+    def catch_up(self):
+        """Return (first_run, archives that are new or changed since the last run).
+
+        Without a previous snapshot the current listing becomes the baseline
+        and nothing is returned (Extract All Existing covers that case).
+        """
+        current = self.scan()
+        with self._lock:
+            first_run = self.entries is None
+            if first_run:
+                self.entries = current
+                self._dirty = True
+                changed = []
+            else:
+                changed = [name for name, sig in current.items() if self.entries.get(name) != sig]
+                # Forget archives that disappeared while we were not running
+                for name in [name for name in self.entries if name not in current]:
+                    del self.entries[name]
+                    self._dirty = True
+        self.save()
+        return first_run, [self.folder / name for name in sorted(changed)]
+
+    def record(self, file_path):
+        """Mark an archive as handled (or forget it if it has been deleted)."""
+        file_path = Path(file_path)
+        try:
+            st = os.stat(file_path)
+            sig = [st.st_size, st.st_mtime_ns, st.st_ino]
+        except OSError:
+            sig = None
+        with self._lock:
+            if self.entries is None:
+                self.entries = {}
+            if sig is None:
+                self.entries.pop(file_path.name, None)
+            else:
+                self.entries[file_path.name] = sig
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = self._load_all()
+            data[self.key] = dict(self.entries or {})
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            except OSError:
+                pass
+
+_SIZE_BOUND = re.compile(r"^(>=|<=|>|<)(\d+(?:\.\d+)?)([kmgt]?)i?b?$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+def _glob_regex(pattern):
+    """Regex for a glob on "/"-separated paths, like fnmatch.translate() but with "*" and "?" kept within one folder."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            if pattern.startswith("*", i):
+                i += 1
+                if pattern.startswith("/", i):
+                    # "**/" also matches no folder at all
+                    i += 1
+                    out.append("(?:.*/)?")
+                else:
+                    out.append(".*")
+            else:
+                out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1 if pattern.startswith(("!", "]"), i) else i)
+            if end < 0:
+                out.append(re.escape(c))
+                continue
+            chars = pattern[i:end]
+            i = end + 1
+            if chars.startswith("!"):
+                out.append("[^/" + chars[1:] + "]")
+            else:
+                out.append("[" + ("\\" + chars if chars.startswith("^") else chars) + "]")
+        else:
+            out.append(re.escape(c))
+    return "(?s:" + "".join(out) + r")\Z"
+
+def parse_extensions(text):
+    """Split a ``file_exts``-style list ("jpg, .PNG") into bare lowercase extensions."""
+    return [ext.strip().lstrip(".").lower() for ext in (text or "").split(",") if ext.strip()]
+
+class SelectionRules:
+    """Archive member selection, compiled once into one regex per rule kind and size range.
+
+    Rules are ``(action, pattern, min_size, max_size)`` tuples where action
+    is "include" or "exclude" and sizes are inclusive byte bounds (None for
+    no upper bound). Patterns are globs matched case-insensitively against
+    the member path: one without "/" matches the file name at any depth
+    ("*.png"), one ending in "/" matches everything under a folder of that
+    name ("__MACOSX/"), a leading "/" anchors at the archive root, and
+    anything else must match the whole path ("*/renders/*.png"). "*" and
+    "?" never match "/", so each stays within one folder level; "**"
+    matches across folders ("assets/**/*.png"). An exclude always wins;
+    with no includes every member that isn't excluded matches.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        groups = {}
+        for action, pattern, min_size, max_size in self.rules:
+            groups.setdefault((action, min_size, max_size), []).append(self._translate(pattern))
+        # Excludes first so a rejected member stops at the first hit
+        self._compiled = sorted(
+            ((action, min_size, max_size, re.compile("|".join(f"(?:{p})" for p in parts), re.IGNORECASE))
+             for (action, min_size, max_size), parts in groups.items()),
+            key=lambda group: group[0] != "exclude"
+        )
+        self.has_includes = any(rule[0] == "include" for rule in self.rules)
+
+    @classmethod
+    def parse(cls, text, extensions=()):
+        """Build rules from a ``select_rules`` setting plus ``file_exts``-style extensions.
+
+        ``text`` holds ";"-separated rules, e.g.
+        ``*/renders/*.png >1MB; exclude __MACOSX/; !*.tmp <=4KB``. A rule
+        starts with an optional "include"/"exclude" (or "!"), then the
+        pattern, then any size bounds (``>``, ``>=``, ``<``, ``<=`` with an
+        optional KB/MB/GB unit).
+        """
+        rules = [("include", f"*.{ext}", 0, None) for ext in extensions]
+        for part in (text or "").split(";"):
+            tokens = part.split()
+            if not tokens:
+                continue
+            action = "include"
+            if tokens[0].lower() in ("include", "exclude"):
+                action = tokens.pop(0).lower()
+            min_size, max_size = 0, None
+            while tokens and _SIZE_BOUND.match(tokens[-1]):
+                op, number, unit = _SIZE_BOUND.match(tokens.pop()).groups()
+                limit = int(float(number) * _SIZE_UNITS[unit.lower()])
+                if op == ">":
+                    min_size = max(min_size, limit + 1)
+                elif op == ">=":
+                    min_size = max(min_size, limit)
+                elif op == "<":
+                    max_size = limit - 1 if max_size is None else min(max_size, limit - 1)
+                else:
+                    max_size = limit if max_size is None else min(max_size, limit)
+            pattern = " ".join(tokens) or "*"
+            if pattern.startswith("!"):
+                action, pattern = "exclude", pattern[1:] or "*"
+            rules.append((action, pattern, min_size, max_size))
+        return cls(rules)
+
+    @staticmethod
+    def _translate(pattern):
+        pattern = pattern.replace("\\", "/")
+        if pattern.startswith("/"):
+            return _glob_regex(pattern.lstrip("/"))
+        if pattern.endswith("/"):
+            return "(?:.*/)?" + _glob_regex(pattern + "**")
+        if "/" in pattern:
+            return _glob_regex(pattern)
+        return "(?:.*/)?" + _glob_regex(pattern)
+
+    def with_includes(self, includes):
+        """These rules' excludes combined with a different set of include rules."""
+        return SelectionRules([rule for rule in self.rules if rule[0] == "exclude"] + list(includes))
+
+    def _hits(self, name, size):
+        name = name.replace("\\", "/")
+        for action, min_size, max_size, regex in self._compiled:
+            if min_size <= size and (max_size is None or size <= max_size) and regex.match(name):
+                yield action
+
+    def excluded(self, name, size=0):
+        return any(action == "exclude" for action in self._hits(name, size))
+
+    def matches(self, name, size=0):
+        for action in self._hits(name, size):
+            return action == "include"
+        return not self.has_includes
+
+def format_size(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+class ArchivePlan:
+    """Everything processing one archive would do, worked out from its member list only."""
+    def __init__(self, archive):
+        self.archive = Path(archive)
+        self.extract_folder = None
+        self.extract_to_downloads = False
+        self.extract = []   # (member name, target path, size)
+        self.copies = []    # (extracted path, destination path, size)
+        self.deletions = [] # paths that would be removed afterwards
+        self.notes = []
+        self.error = None
+
+    @property
+    def bytes_extracted(self):
+        return sum(size for _, _, size in self.extract)
+
+    @property
+    def bytes_copied(self):
+        return sum(size for _, _, size in self.copies)
+
+    def describe(self, limit=None):
+        lines = [f"Plan for {self.archive.name}:"]
+        if self.error:
+            lines.append(f"  cannot plan: {self.error}")
+            return lines
+        where = "monitored folder" if self.extract_to_downloads else "new folder"
+        lines.append(f"  extract {len(self.extract)} file(s), {format_size(self.bytes_extracted)} -> {self.extract_folder} ({where})")
+        lines.extend(f"  {note}" for note in self.notes)
+        shown = self.copies if limit is None else self.copies[:limit]
+        for src, dest, size in shown:
+            lines.append(f"  copy {src} -> {dest} ({format_size(size)})")
+        if len(shown) < len(self.copies):
+            lines.append(f"  ... and {len(self.copies) - len(shown)} more copies")
+        for path in self.deletions:
+            lines.append(f"  delete {path}")
+        lines.append(f"  total: {format_size(self.bytes_extracted)} extracted, {len(self.copies)} file(s) / {format_size(self.bytes_copied)} copied")
+        return lines
+
+# Address space a worker may map beyond its job memory limit (thread stacks, malloc arenas)
+_WORKER_AS_HEADROOM = 512 * 1024 * 1024
+
+def _remove_created(files, dirs):
+    """Remove what a job extracted: the files it created, then the folders it created, deepest first."""
+    for path in reversed(files):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    for folder in sorted(dirs, key=lambda p: len(Path(p).parts), reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+class _ForwardedCleanup:
+    """Stands in for the CleanupQueue inside a worker; deletions are queued by the supervising process."""
+    def __init__(self, send):
+        self.send = send
+
+    def enqueue(self, target, label, log=None):
+        self.send("delete", (str(target), label))
+        return Path(target)
+
+def _limit_worker_memory(resource, memory_limit):
+    if not memory_limit or not hasattr(resource, "RLIMIT_AS"):
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            mapped = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    soft = mapped + memory_limit + _WORKER_AS_HEADROOM
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+def _isolated_worker(conn, stop, cpu_timeout, memory_limit, limits):
+    """Worker process loop: run archive jobs sent by ExtractionSupervisor until told to exit.
+
+    ``limits`` is a shared (read, write) bytes/sec array the supervisor
+    keeps in step with the GUI, so Apply throttles a job already running.
+    """
+    if hasattr(os, "setsid"):
+        # Own process group, so killing the worker also kills an unrar it started
+        os.setsid()
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        _limit_worker_memory(resource, memory_limit)
+    send_lock = threading.Lock()
+
+    def send(kind, payload):
+        with send_lock:
+            conn.send((kind, payload))
+
+    def forward_progress(info):
+        # The supervising handler reports "started" and "done" itself
+        if info.get("stage") not in ("started", "done"):
+            send("progress", info)
+
+    governor = IOGovernor(*limits[:])
+
+    def follow_limits():
+        seen = tuple(limits[:])
+        while True:
+            time.sleep(0.25)
+            latest = tuple(limits[:])
+            if latest != seen:
+                governor.set_limits(*latest)
+                seen = latest
+
+    threading.Thread(target=follow_limits, daemon=True, name="unzipper-limits").start()
+    handler = current = None
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                return
+            if job is None:
+                return
+            archive, settings = job
+            if resource is not None and cpu_timeout:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+                soft = int(usage.ru_utime + usage.ru_stime + cpu_timeout) + 1
+                if hard != resource.RLIM_INFINITY:
+                    soft = min(soft, hard)
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+            if settings != current:
+                if handler is not None:
+                    handler.stop()
+                    if handler.catalog is not None:
+                        handler.catalog.close()
+                options = dict(settings)
+                if options["catalog"] is not None:
+                    options["catalog"] = ArchiveCatalog(options["catalog"])
+                if options.pop("io_low_priority"):
+                    lower_io_priority()
+                handler = ZipExtractorHandler(
+                    governor=governor,
+                    gui_callback=lambda msg: send("log", msg),
+                    progress_callback=forward_progress,
+                    cleanup_queue=_ForwardedCleanup(send),
+                    **options
+                )
+                # So the supervisor can remove a partial extraction if it has to kill this worker
+                handler.on_member_created = lambda path, is_dir: send("created", (str(path), is_dir))
+                current = settings
+            try:
+                stats = handler.process_archive(archive, stop_event=stop)
+            except Exception as e:
+                stats = {"archive": Path(archive), "ok": False, "error": f"Error extracting {Path(archive).name}: {e}",
+                         "delivered": [], "bytes_extracted": 0, "bytes_copied": 0, "seconds": 0.0, "peak_memory": 0}
+                send("log", stats["error"])
+            send("result", stats)
+    finally:
+        if handler is not None:
+            handler.stop()
+            if handler.catalog is not None:
+                handler.catalog.close()
+
+class _Worker:
+    def __init__(self, process, conn, stop, limits):
+        self.process = process
+        self.conn = conn
+        self.stop = stop
+        self.limits = limits
+        self.jobs = 0
+
+class ExtractionSupervisor:
+    """Runs archive jobs in worker processes, so a hung or runaway archive can be killed.
+
+    Every job gets a wall-clock ``job_timeout``. Where the resource module
+    exists, a worker also gets ``cpu_timeout`` seconds of CPU per job
+    (RLIMIT_CPU) and an address-space backstop of ``memory_limit`` plus some
+    headroom (RLIMIT_AS); elsewhere only the wall clock and the handler's own
+    MemoryWatch apply. Workers are replaced after ``max_jobs_per_worker``
+    jobs. An archive whose worker had to be killed or crashed, or that turned
+    out to be corrupt, is moved to ``quarantine_dir`` (default: a
+    "_quarantine" folder next to it). Jobs for the same destination run one
+    at a time, so ``_1``/``_2`` renaming stays consistent across workers.
+    """
+    def __init__(self, workers=1, job_timeout=1800, cpu_timeout=0, memory_limit=0, max_jobs_per_worker=50,
+                 quarantine_dir=None, stop_grace=10):
+        self.workers = max(1, int(workers))
+        self.job_timeout = float(job_timeout or 0)
+        self.cpu_timeout = int(cpu_timeout or 0)
+        self.memory_limit = int(memory_limit or 0)
+        self.max_jobs_per_worker = max(1, int(max_jobs_per_worker))
+        self.quarantine_dir = Path(quarantine_dir) if quarantine_dir else None
+        self.stop_grace = stop_grace
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._targets = collections.defaultdict(threading.Lock)
+        self._idle = []
+        self._closed = False
+        self.started = time.monotonic()
+        self.busy = 0.0
+        self.jobs = 0
+        self.recycled = 0
+        self.killed = 0
+        self.quarantined = 0
+
+    def run(self, archive_path, settings, on_message, stop_event=None, governor=None):
+        """Run one job; returns the worker's stats dict, or a failed one if the worker had to be killed.
+
+        ``settings`` are picklable ZipExtractorHandler arguments (see
+        ZipExtractorHandler._worker_settings()); log lines, progress events
+        and deletions from the worker arrive as ``on_message(kind, payload)``.
+        The worker follows ``governor``'s caps while the job runs.
+        """
+        archive_path = Path(archive_path)
+        with self._lock:
+            target_lock = self._targets[os.path.normcase(os.path.abspath(settings["target_folder"]))]
+        with target_lock, self._slots:
+            worker = self._checkout()
+            started = time.monotonic()
+            killed = True
+            try:
+                stats, killed, reason = self._wait(worker, archive_path, settings, on_message, stop_event, governor)
+            finally:
+                with self._lock:
+                    self.busy += time.monotonic() - started
+                    self.jobs += 1
+                self._checkin(worker, killed)
+        if reason is not None:
+            on_message("log", stats["error"])
+        if (reason is not None and not (stop_event and stop_event.is_set())) or stats.get("bad_archive"):
+            moved = self._quarantine(archive_path)
+            if moved is not None:
+                on_message("log", f"Quarantined {archive_path.name}: moved to {moved}")
+        return stats
+
+    def _wait(self, worker, archive_path, settings, on_message, stop_event, governor):
+        # Files and folders the job has created, removed again if the worker has to be killed
+        created = ([], [])
+        worker.stop.clear()
+        worker.limits[:] = governor.limits if governor is not None else (0, 0)
+        worker.conn.send((str(archive_path), settings))
+        worker.jobs += 1
+        deadline = time.monotonic() + self.job_timeout if self.job_timeout else None
+        grace = None
+        while True:
+            if governor is not None:
+                worker.limits[:] = governor.limits
+            if stop_event is not None and stop_event.is_set() and grace is None:
+                worker.stop.set()
+                grace = time.monotonic() + self.stop_grace
+            try:
+                message = worker.conn.recv() if worker.conn.poll(0.2) else None
+            except (EOFError, OSError):
+                message = ("exited", None)
+            if message is not None and message[0] == "result":
+                return message[1], False, None
+            if message is not None and message[0] == "created":
+                path, is_dir = message[1]
+                created[is_dir].append(path)
+                continue
+            if message is not None and message[0] != "exited":
+                on_message(*message)
+                continue
+            if message is None and worker.process.is_alive():
+                now = time.monotonic()
+                if grace is not None and now > grace:
+                    reason = f"did not stop within {self.stop_grace:g}s"
+                elif deadline is not None and now > deadline:
+                    reason = f"timed out after {self.job_timeout:g}s"
+                else:
+                    continue
+                self._kill(worker)
+            else:
+                worker.process.join(5)
+                reason = self._exit_reason(worker.process.exitcode)
+            files, dirs = created
+            if files or dirs:
+                _remove_created(files, dirs)
+                on_message("log", f"Removed the partial extraction of {archive_path.name} ({len(files)} file(s)).")
+            stats = {"archive": archive_path, "ok": False, "error": f"Error: {archive_path.name} {reason}; worker stopped.",
+                     "delivered": [], "bytes_extracted": 0, "bytes_copied": 0, "seconds": 0.0, "peak_memory": 0}
+            return stats, True, reason
+
+    @staticmethod
+    def _exit_reason(exitcode):
+        import signal
+        if exitcode is not None and exitcode < 0:
+            if exitcode == -getattr(signal, "SIGXCPU", 0):
+                return "exceeded the CPU time limit"
+            return f"crashed the worker (signal {-exitcode})"
+        return f"crashed the worker (exit code {exitcode})"
+
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        stop = self._ctx.Event()
+        limits = self._ctx.Array("q", 2, lock=False)
+        process = self._ctx.Process(
+            target=_isolated_worker, args=(child_conn, stop, self.cpu_timeout, self.memory_limit, limits),
+            name="unzipper-worker", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn, stop, limits)
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.conn.close()
+        return self._spawn()
+
+    def _checkin(self, worker, killed):
+        if killed:
+            with self._lock:
+                self.killed += 1
+            worker.conn.close()
+            return
+        with self._lock:
+            if not self._closed and worker.jobs < self.max_jobs_per_worker:
+                self._idle.append(worker)
+                return
+            if not self._closed:
+                self.recycled += 1
+        self._retire(worker)
+
+    def _retire(self, worker):
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        worker.process.join(5)
+        if worker.process.is_alive():
+            self._kill(worker)
+        worker.conn.close()
+
+    @staticmethod
+    def _kill(worker):
+        try:
+            if hasattr(os, "killpg"):
+                import signal
+                os.killpg(worker.process.pid, signal.SIGKILL)
+            else:
+                worker.process.kill()
+        except OSError:
+            worker.process.kill()
+        worker.process.join(5)
+
+    def _quarantine(self, archive_path):
+        if not archive_path.exists():
+            return None
+        folder = self.quarantine_dir or archive_path.parent / "_quarantine"
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            dest = folder / archive_path.name
+            counter = 1
+            while dest.exists():
+                dest = folder / f"{archive_path.stem}_{counter}{archive_path.suffix}"
+                counter += 1
+            move(str(archive_path), str(dest))
+        except OSError:
+            return None
+        with self._lock:
+            self.quarantined += 1
+        return dest
+
+    def report(self):
+        """One log line on how busy the workers have been since the supervisor started."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self._lock:
+            utilisation = self.busy / (elapsed * self.workers)
+            return (f"Worker processes: {self.jobs} job(s) on {self.workers} worker(s), {utilisation:.0%} busy, "
+                    f"{self.recycled} recycled, {self.killed} killed, {self.quarantined} archive(s) quarantined.")
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            self._retire(worker)
 
 class ZipExtractorHandler(FileSystemEventHandler):
     def __init__(
         self, download_folder, target_folder, delete_after_zip=False, delete_after_extracted=False,
-        file_exts=None, gui_callback=None, copy_enabled=True, logic_input=None, logic_enabled=False, copy_whole_folder=False
+        file_exts=None, gui_callback=None, copy_enabled=True, logic_input=None, logic_enabled=False, copy_whole_folder=False,
+        governor=None, schedule_order="fifo", io_low_priority=False, snapshot=None,
+        buffer_size=COPY_CHUNK_SIZE, memory_limit=0, deflate_backend="auto",
+        in_flight=None, coalesce_window=1.0, create_target=True, progress_callback=None,
+        copy_concurrency=4, cleanup_queue=None, select_rules=None, isolation=None, catalog=None,
+        leases=None
     ):
         self.download_folder = Path(download_folder)
         self.processed_files = set()
         self.target_folder = Path(target_folder)
-        self.target_folder.mkdir(parents=True, exist_ok=True)
+        if create_target:
+            self.target_folder.mkdir(parents=True, exist_ok=True)
         self.copy_enabled = copy_enabled
         self.logic_input = logic_input
         self.logic_enabled = logic_enabled
         self.copy_whole_folder = copy_whole_folder
-        if file_exts:
-            cleaned = [ext.strip().lstrip(".").lower() for ext in file_exts.split(',') if ext.strip()]
-            if cleaned:
-                self.collect_exts = {ext for ext in cleaned}
-            else:
-                self.collect_exts = None
-        else:
-            self.collect_exts = None
+        self.file_exts = file_exts
+        cleaned = parse_extensions(file_exts)
+        # file_exts and logic_input keep their meaning; select_rules adds globs, size bounds and excludes
+        self.select_rules = select_rules or ""
+        self.copy_rules = SelectionRules.parse(self.select_rules, extensions=cleaned)
+        self.priority_rules = [
+            (ext_group, self.copy_rules.with_includes(("include", f"*.{ext}", 0, None) for ext in ext_group))
+            for ext_group in self._parse_priority_logic()
+        ]
         self.archive_exts = {'.zip', '.rar'}
         self.gui_callback = gui_callback
+        self.progress_callback = progress_callback
+        self.job_stats = None
+        self._stats_lock = threading.Lock()
         self.delete_after_zip = delete_after_zip
         self.delete_after_extracted = delete_after_extracted
+        self.governor = governor or IOGovernor()
+        self.io_low_priority = io_low_priority
+        self.scheduler = ArchiveScheduler(self._process_when_ready, order=schedule_order, low_priority=io_low_priority)
+        self.in_flight = in_flight or InFlightRegistry()
+        self.coalescer = EventCoalescer(self._enqueue, window=coalesce_window)
+        self.buffer_size = max(64 * 1024, int(buffer_size))
+        self.memory = MemoryWatch(memory_limit)
+        self.deflate_backend, self._inflate_module = get_deflate_backend(deflate_backend)
+        # Keep queued copy data well inside the memory ceiling
+        max_in_flight = min(64 * 1024 * 1024, memory_limit // 4) if memory_limit else 64 * 1024 * 1024
+        self.copy_concurrency = max(1, int(copy_concurrency))
+        self.writer = DestinationWriter(governor=self.governor, max_in_flight=max_in_flight, buffer_size=self.buffer_size,
+                                        workers=self.copy_concurrency, low_priority=io_low_priority)
+        self.snapshot = snapshot
+        self.cleanup = cleanup_queue or get_cleanup_queue()
+        # An ExtractionSupervisor runs each job in a worker process instead of on this thread
+        self.isolation = isolation
+        self.catalog = catalog
+        self._catalog_job = None
+        # (files, folders) the current job's extraction created, for rolling it back
+        self._extracted = None
+        # Called as on_member_created(path, is_dir) before each file or folder is created (worker processes report them)
+        self.on_member_created = None
+        # Set by stop(); interrupts the monitored job in progress at its next buffer
+        self.stop_event = threading.Event()
+        # A LeaseManager shares the monitored folder with other instances
+        self.leases = leases
 
     def log(self, msg):
+        if self.job_stats is not None and msg.startswith("Error"):
+            self.job_stats["error"] = msg
         if self.gui_callback:
             self.gui_callback(msg)
         else:
@@ -152,79 +2153,445 @@ class ZipExtractorHandler(FileSystemEventHandler):
     def on_created(self, event):
         if event.is_directory:
             return
-        file_path = Path(event.src_path)
-        ext = file_path.suffix.lower()
-        if ext in self.archive_exts and file_path not in self.processed_files:
-            if self._wait_until_file_ready(file_path):
-                time.sleep(0.5)
-                if ext == '.zip':
-                    self.extract_zip(file_path)
-                elif ext == '.rar':
-                    self.extract_rar(file_path)
+        self._on_archive_event(Path(event.src_path))
 
     def on_moved(self, event):
         # Handle file renames (e.g., .crdownload -> .zip)
         if event.is_directory:
             return
-        file_path = Path(event.dest_path)
+        self._on_archive_event(Path(event.dest_path))
+
+    def on_modified(self, event):
+        # A growing download keeps firing these; they only extend the quiet period
+        if event.is_directory:
+            return
+        self._on_archive_event(Path(event.src_path))
+
+    def _on_archive_event(self, file_path):
         ext = file_path.suffix.lower()
         if ext in self.archive_exts and file_path not in self.processed_files:
+            self.coalescer.notify(file_path)
+
+    def _enqueue(self, file_path, events=1):
+        if events > 1:
+            self.log(f"Merged {events} file system events for {file_path.name} into one job.")
+        if file_path in self.processed_files:
+            return
+        if not self.in_flight.claim(file_path):
+            self.log(f"Skipping {file_path.name}: it is already queued or being extracted.")
+            return
+        self._progress("queued", archive=str(file_path))
+        self.scheduler.submit(file_path)
+
+    def duplicate_stats(self):
+        """(events merged by the coalescer, jobs refused because the archive was in flight)"""
+        return self.coalescer.suppressed, self.in_flight.suppressed
+
+    def stop(self):
+        self.stop_event.set()
+        if self.leases is not None:
+            self.leases.unwatch(self._enqueue)
+        self.coalescer.stop()
+        # Queued archives were claimed in the shared registry by _enqueue()
+        for file_path in self.scheduler.stop():
+            self.in_flight.release(file_path)
+        self.writer.stop()
+        if self.snapshot is not None:
+            self.snapshot.save()
+
+    def catch_up(self):
+        """Enqueue archives that arrived or changed while the app was not running."""
+        if self.snapshot is None:
+            return
+        first_run, changed = self.snapshot.catch_up()
+        if first_run:
+            self.log(f"Recorded snapshot of {len(self.snapshot.entries)} existing archive(s); use Extract All Existing to process them.")
+            return
+        if changed:
+            self.log(f"Catching up on {len(changed)} archive(s) that arrived while not monitoring...")
+        for file_path in changed:
+            self._enqueue(file_path)
+
+    def enqueue_existing(self):
+        """Enqueue every archive already in the monitored folder (for running without a snapshot)."""
+        archives = [Path(entry.path) for entry in os.scandir(self.download_folder)
+                    if entry.is_file() and Path(entry.name).suffix.lower() in self.archive_exts]
+        for file_path in archives:
+            self._enqueue(file_path)
+        return len(archives)
+
+    def _process_when_ready(self, file_path):
+        # Runs on the scheduler thread, one archive at a time
+        self._progress("dequeued", archive=str(file_path))
+        try:
+            if file_path in self.processed_files:
+                return
+            if self.leases is not None and self._leased_elsewhere(file_path):
+                return
             if self._wait_until_file_ready(file_path):
                 time.sleep(0.5)
-                if ext == '.zip':
-                    self.extract_zip(file_path)
-                elif ext == '.rar':
-                    self.extract_rar(file_path)
+                self.process_archive(file_path, stop_event=self.stop_event)
+        finally:
+            self.in_flight.release(file_path)
 
-    def _copy_entire_folder(self, src_folder):
-        import shutil
-        dest = self.target_folder / Path(src_folder).name
+    def process_archive(self, file_path, stop_event=None):
+        """Extract and copy one archive; returns the job's stats dict.
+
+        With a LeaseManager the archive is only processed if this instance
+        wins its lease; otherwise the stats have ``claimed_elsewhere`` set.
+        Losing the lease part way through stops the job like stop_event.
+        """
+        file_path = Path(file_path)
+        if self.leases is None:
+            return self._process(file_path, stop_event)
+        lease_lost = threading.Event()
+        if not self._claim_lease(file_path, on_lost=lambda path: lease_lost.set()):
+            stats = self._new_stats(file_path)
+            stats["claimed_elsewhere"] = True
+            return stats
+        stats = None
+        try:
+            stats = self._process(file_path, _AnyEvent(stop_event, lease_lost))
+        finally:
+            self.leases.release(file_path, done=bool(stats and stats["ok"]))
+        return stats
+
+    def _leased_elsewhere(self, file_path):
+        # Checked before the readiness wait, so archives other instances have
+        # finished or are working on do not hold up this instance's queue
+        if self.leases.is_done(file_path):
+            self.log(f"Skipping {file_path.name}: already processed by another instance.")
+            return True
+        owner = self.leases.owner(file_path)
+        if owner is None or owner == self.leases.instance_id:
+            return False
+        self.log(f"Skipping {file_path.name}: {owner} is processing it (taken over if its lease expires).")
+        self.leases.watch(file_path, self._enqueue)
+        return True
+
+    def _claim_lease(self, file_path, on_lost=None):
+        if self.leases.is_done(file_path):
+            self.log(f"Skipping {file_path.name}: already processed by another instance.")
+            return False
+        if not self.leases.claim(file_path, on_lost=on_lost):
+            owner = self.leases.owner(file_path) or "another instance"
+            self.log(f"Skipping {file_path.name}: {owner} is processing it (taken over if its lease expires).")
+            self.leases.watch(file_path, self._enqueue)
+            return False
+        if self.leases.is_done(file_path):
+            # Finished elsewhere between the check and the claim
+            self.leases.release(file_path)
+            self.log(f"Skipping {file_path.name}: already processed by another instance.")
+            return False
+        return True
+
+    @staticmethod
+    def _new_stats(file_path):
+        return {
+            "archive": file_path, "ok": False, "error": None, "delivered": [],
+            "bytes_extracted": 0, "bytes_copied": 0, "seconds": 0.0, "peak_memory": 0,
+            "bad_archive": False,
+        }
+
+    def _process(self, file_path, stop_event=None):
+        ext = file_path.suffix.lower()
+        self.memory.reset()
+        self.job_stats = stats = self._new_stats(file_path)
+        started = time.perf_counter()
+        self._progress("started", archive=str(file_path))
+        if self.catalog is not None and self.isolation is None:
+            self._catalog_job = {"members": [], "dests": {}, "signature": ArchiveCatalog.signature(file_path)}
+        try:
+            if self.isolation is not None and ext in self.archive_exts:
+                self._run_isolated(file_path, stop_event)
+            elif ext == '.zip':
+                self.extract_zip(file_path, stop_event=stop_event)
+            elif ext == '.rar':
+                self.extract_rar(file_path, stop_event=stop_event)
+            self._record_catalog(file_path)
+        finally:
+            self._catalog_job = None
+            self._extracted = None
+            self.job_stats = None
+            # A stopped job is left unrecorded so the next catch-up retries it
+            if self.snapshot is not None and (file_path in self.processed_files or not (stop_event and stop_event.is_set())):
+                self.snapshot.record(file_path)
+        if self.isolation is None:
+            self.memory.sample()
+            if self.memory.peak:
+                self.log(f"Peak memory growth while processing {file_path.name}: {self.memory.peak / (1024 * 1024):.0f} MB")
+            stats["peak_memory"] = self.memory.peak
+        stats["ok"] = file_path in self.processed_files
+        stats["seconds"] = time.perf_counter() - started
+        self._progress("done", archive=str(file_path), ok=stats["ok"])
+        return stats
+
+    def _worker_settings(self):
+        """Picklable arguments for the copy of this handler that runs inside a worker process."""
+        return {
+            "download_folder": str(self.download_folder), "target_folder": str(self.target_folder),
+            "delete_after_zip": self.delete_after_zip, "delete_after_extracted": self.delete_after_extracted,
+            "file_exts": self.file_exts, "copy_enabled": self.copy_enabled,
+            "logic_input": self.logic_input, "logic_enabled": self.logic_enabled,
+            "copy_whole_folder": self.copy_whole_folder, "select_rules": self.select_rules,
+            "buffer_size": self.buffer_size, "memory_limit": self.memory.limit,
+            "deflate_backend": self.deflate_backend, "copy_concurrency": self.copy_concurrency,
+            "io_low_priority": self.io_low_priority,
+            "catalog": None if self.catalog is None else str(self.catalog.path),
+        }
+
+    def _run_isolated(self, file_path, stop_event=None):
+        def on_message(kind, payload):
+            if kind == "log":
+                self.log(payload)
+            elif kind == "progress" and self.progress_callback is not None:
+                self.progress_callback(payload)
+            elif kind == "delete":
+                # Tombstones and retries stay with this process's cleanup queue
+                self.cleanup.enqueue(*payload, log=self.log)
+        result = self.isolation.run(file_path, self._worker_settings(), on_message, stop_event=stop_event, governor=self.governor)
+        for key in ("delivered", "bytes_extracted", "bytes_copied", "peak_memory", "bad_archive"):
+            if key in result:
+                self.job_stats[key] = result[key]
+        if result.get("error") and not self.job_stats["error"]:
+            self.job_stats["error"] = result["error"]
+        if result.get("ok"):
+            self.processed_files.add(file_path)
+
+    def _record_catalog(self, file_path):
+        job = self._catalog_job
+        if job is None or file_path not in self.processed_files:
+            return
+        dests = job["dests"]
+        try:
+            count = self.catalog.record(file_path, (
+                (name, size, crc, dests.get(target)) for name, size, crc, target in job["members"]
+            ), signature=job["signature"])
+        except sqlite3.Error as e:
+            self.log(f"Failed to update catalog for {file_path.name}: {e}")
+            return
+        self._progress("cataloged", archive=str(file_path), members=count)
+
+    def _flag_bad_archive(self):
+        if self.job_stats is not None:
+            self.job_stats["bad_archive"] = True
+
+    def _byte_progress(self, phase, total):
+        archive = str(self.job_stats["archive"]) if self.job_stats is not None else None
+        return ByteProgress(
+            lambda done, total, rate: self._progress("bytes", archive=archive, phase=phase, done=done, total=total, rate=rate),
+            total
+        )
+
+    def _progress(self, stage, **info):
+        if self.progress_callback is not None:
+            info["stage"] = stage
+            self.progress_callback(info)
+
+    def _delete_later(self, path, label):
+        tombstone = self.cleanup.enqueue(path, label, log=self.log)
+        self.log(f"Queued {label} for deletion: {path}" + (f" (as {tombstone.name})" if tombstone != Path(path) else ""))
+
+    def _count(self, key, nbytes):
+        stats = self.job_stats
+        if stats is not None:
+            with self._stats_lock:
+                stats[key] += nbytes
+
+    def _archive_layout(self, archive_path, infos, taken=()):
+        """Return (extract root, extracted folder, extracted straight into the monitored folder?).
+
+        An archive whose members all sit under one top-level directory is
+        extracted as-is into the monitored folder; anything else gets its own
+        folder named after the archive.
+        """
+        root_dirs = set()
+        has_root_files = False
+        for info in infos:
+            parts = info.filename.split('/')
+            if len(parts) == 1 or (len(parts) == 2 and parts[1] == ''):
+                has_root_files = True
+                break
+            root_dirs.add(parts[0])
+            if len(root_dirs) > 1:
+                break
+        if len(root_dirs) == 1 and not has_root_files:
+            return self.download_folder, self.download_folder / root_dirs.pop(), True
+        extract_folder = self.download_folder / archive_path.stem
         counter = 1
-        orig_dest = dest
-        while dest.exists():
-            dest = self.target_folder / f"{orig_dest.stem}_{counter}{orig_dest.suffix}"
+        original_extract_folder = extract_folder
+        while extract_folder.exists() or extract_folder in taken:
+            extract_folder = Path(f"{original_extract_folder}_{counter}")
+            counter += 1
+        return extract_folder, extract_folder, False
+
+    @staticmethod
+    def _member_target(dest_root, name):
+        # Same sanitising as ZipFile.extract(): no absolute paths, drives or ".." escapes
+        name = name.replace("\\", "/")
+        if os.path.sep == "\\" and hasattr(zipfile.ZipFile, "_sanitize_windows_name"):
+            name = zipfile.ZipFile._sanitize_windows_name(name, "/")
+        parts = [p for p in os.path.splitdrive(name)[1].split("/") if p not in ("", ".", "..")]
+        if not parts:
+            return None
+        return Path(dest_root).joinpath(*parts)
+
+    def _open_member(self, archive_ref, info):
+        # Deflated, unencrypted ZIP members go through the selected inflate backend
+        if (self.deflate_backend != "zlib" and isinstance(archive_ref, zipfile.ZipFile)
+                and info.compress_type == zipfile.ZIP_DEFLATED and not info.flag_bits & 0x1):
+            return InflateReader(archive_ref.filename, info, self._inflate_module)
+        return archive_ref.open(info)
+
+    def _selected(self, name, size):
+        """Whether a member is picked by file_exts/select_rules or by any priority level."""
+        if self.copy_enabled and self.copy_rules.matches(name, size):
+            return True
+        if self.logic_enabled and self.logic_input:
+            return any(rules.matches(name, size) for _, rules in self.priority_rules)
+        return False
+
+    def _stream_extract(self, archive_ref, infos, dest_root, stop_event=None):
+        """Extract members one at a time through a single reusable buffer.
+
+        Members excluded by the selection rules are never written. Returns
+        ``(member name, extracted path, size)`` for the members the copy
+        step will want, so it does not have to walk the extracted tree.
+        stop_event is checked on every buffer; if it is set, everything
+        written so far is removed and JobCancelled is raised. Output is
+        removed the same way when extraction fails for any other reason
+        (a corrupt member, the memory ceiling, a full disk).
+        """
+        wanted = [info for info in infos if not self.copy_rules.excluded(info.filename, info.file_size)]
+        skipped = sum(1 for info in infos if not info.is_dir()) - sum(1 for info in wanted if not info.is_dir())
+        progress = self._byte_progress("extracting", sum(info.file_size for info in wanted if not info.is_dir()))
+        buf = bytearray(self.buffer_size)
+        view = memoryview(buf)
+        made_dirs = set()
+        created_files = []
+        created_dirs = []
+        self._extracted = (created_files, created_dirs)
+        selected = []
+        try:
+            for info in wanted:
+                target = self._member_target(dest_root, info.filename)
+                if target is None:
+                    continue
+                folder = target if info.is_dir() else target.parent
+                if folder not in made_dirs:
+                    missing = folder
+                    while not missing.exists():
+                        created_dirs.append(missing)
+                        if self.on_member_created is not None:
+                            self.on_member_created(missing, True)
+                        missing = missing.parent
+                    folder.mkdir(parents=True, exist_ok=True)
+                    made_dirs.add(folder)
+                if info.is_dir():
+                    continue
+                # A file that was already there is never removed by a roll back
+                if not target.exists():
+                    created_files.append(target)
+                    if self.on_member_created is not None:
+                        self.on_member_created(target, False)
+                with self._open_member(archive_ref, info) as src, open(target, "wb") as dst:
+                    while True:
+                        if stop_event is not None and stop_event.is_set():
+                            raise JobCancelled(f"stopped while extracting {info.filename}")
+                        n = src.readinto(view)
+                        if not n:
+                            break
+                        self.governor.throttle_read(n)
+                        dst.write(view[:n])
+                        self.governor.throttle_write(n)
+                        progress.add(n)
+                        self.memory.check()
+                self._count("bytes_extracted", info.file_size)
+                self._progress("extracted", member=info.filename, size=info.file_size)
+                if not self.copy_whole_folder and self._selected(info.filename, info.file_size):
+                    selected.append((info.filename, target, info.file_size))
+                if self._catalog_job is not None:
+                    self._catalog_job["members"].append((info.filename, info.file_size, getattr(info, "CRC", None), target))
+        except BaseException:
+            _remove_created(created_files, created_dirs)
+            raise
+        progress.finish()
+        if skipped:
+            self.log(f"Skipped {skipped} file(s) excluded by selection rules.")
+        return selected
+
+    def _unique_dest(self, name):
+        # Same "_1", "_2" renaming as before, but also skipping names still being written
+        dest_file = self.target_folder / name
+        counter = 1
+        base_name = dest_file.stem
+        ext_name = dest_file.suffix
+        while not self.writer.reserve(dest_file):
+            dest_file = self.target_folder / f"{base_name}_{counter}{ext_name}"
             counter += 1
+        return dest_file
+
+    def _copy_file(self, src, dst, stop_event=None, progress=None):
+        # Reads happen here; writes happen on the destination writer thread.
+        # A stopped copy is discarded, so only its temp file ever existed.
+        file_id = self.writer.open(dst, src)
         try:
-            shutil.copytree(src_folder, dest)
-            self.log(f"Copied entire folder: {src_folder} -> {dest}")
-            # Always delete extracted folder after copying if option is enabled
-            if self.delete_after_extracted and Path(src_folder).exists():
-                try:
-                    shutil.rmtree(src_folder)
-                    self.log(f"Deleted extracted folder after copying: {src_folder}")
-                except Exception as e:
-                    self.log(f"Failed to delete extracted folder after copying: {src_folder} ({e})")
-        except Exception as e:
-            self.log(f"Failed to copy entire folder: {src_folder} -> {dest}: {e}")
+            with open(src, "rb") as fsrc:
+                while True:
+                    if stop_event is not None and stop_event.is_set():
+                        raise JobCancelled(f"stopped while copying {src}")
+                    chunk = fsrc.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    self.governor.throttle_read(len(chunk))
+                    self.writer.write(file_id, chunk)
+                    self._count("bytes_copied", len(chunk))
+                    if progress is not None:
+                        progress.add(len(chunk))
+                    self.memory.check()
+        except Exception:
+            self.writer.discard(file_id)
+            raise
+        self.writer.close(file_id)
+        return dst
+
+    def _finish_copies(self, stop_event=None, log_copies=True):
+        """Publish this archive's copies, or if the job was stopped, discard all of them and raise JobCancelled."""
+        if not self.writer.drain(stop_event):
+            self.writer.abort()
+            raise JobCancelled("stopped while copying")
+        return self._publish_copies(log_copies=log_copies)
+
+    def _publish_copies(self, log_copies=True):
+        """fsync and atomically rename this archive's copies; returns the writer's results."""
+        results = self.writer.publish()
+        for src, dest, error in results:
+            if error is not None:
+                self.log(f"Failed to copy {src}: {error}")
+                continue
+            if log_copies:
+                self.log(f"Copied: {src} -> {dest}")
+            if self.job_stats is not None:
+                self.job_stats["delivered"].append(dest)
+            if self._catalog_job is not None:
+                self._catalog_job["dests"][Path(src)] = dest
+            self._progress("delivered", src=str(src), dest=str(dest))
+        stall, busy = self.writer.take_stats()
+        if stall >= 1.0:
+            self.log(f"Destination is the bottleneck: copying waited {stall:.1f}s for writes to {self.target_folder} to drain ({busy:.1f}s spent writing).")
+        return results
 
     def extract_zip(self, zip_path, stop_event=None):
         try:
             if not zip_path.exists():
                 return
-            self.log(f"Found new ZIP file: {zip_path.name}")
+            self.log(f"Found new ZIP file: {zip_path.name} (decompression backend: {self.deflate_backend})")
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                root_dirs = set()
-                root_files = set()
-                for member in zip_ref.namelist():
-                    parts = member.split('/')
-                    if len(parts) == 1 or (len(parts) == 2 and parts[1] == ''):
-                        root_files.add(parts[0])
-                    else:
-                        root_dirs.add(parts[0])
-                root_dirs = {d for d in root_dirs if any(f.startswith(d + '/') for f in zip_ref.namelist())}
-                extract_to_downloads = False
-                if len(root_dirs) == 1 and not root_files:
-                    extract_folder = self.download_folder / list(root_dirs)[0]
-                    zip_ref.extractall(self.download_folder)
-                    extract_to_downloads = True
-                else:
-                    extract_folder = self.download_folder / zip_path.stem
-                    counter = 1
-                    original_extract_folder = extract_folder
-                    while extract_folder.exists():
-                        extract_folder = Path(f"{original_extract_folder}_{counter}")
-                        counter += 1
-                    zip_ref.extractall(extract_folder)
+                # infolist() is walked once; no name lists are built alongside it
+                infos = zip_ref.infolist()
+                extract_root, extract_folder, extract_to_downloads = self._archive_layout(zip_path, infos)
+                members = self._stream_extract(zip_ref, infos, extract_root, stop_event=stop_event)
+                del infos
             if extract_to_downloads:
                 self.log(f"Successfully extracted to monitored folder: {extract_folder}")
                 search_folder = extract_folder
@@ -232,26 +2599,27 @@ class ZipExtractorHandler(FileSystemEventHandler):
                 self.log(f"Successfully extracted to: {extract_folder}")
                 search_folder = extract_folder
             # Copy whole folder if enabled
-            if self.copy_whole_folder:
-                self.log("Copying entire extracted folder to destination (option enabled)...")
-                self._copy_entire_folder(search_folder)
-                # Always try to delete after copying (handled in _copy_entire_folder)
-            else:
-                self.copy_selected_files(search_folder, stop_event=stop_event)
+            if not self._copy_extracted(search_folder, members, stop_event):
+                self.log(f"Stopped processing {zip_path.name}; nothing was delivered and the archive was kept.")
+                return
             self.processed_files.add(zip_path)
             # Delete ZIP if option is enabled
             if self.delete_after_zip:
                 try:
                     if zip_path.exists():
-                        zip_path.unlink()
-                        self.log(f"Deleted ZIP file: {zip_path}")
+                        self._delete_later(zip_path, "ZIP file")
                 except Exception as e:
                     self.log(f"Failed to delete ZIP file: {zip_path} ({e})")
+        except JobCancelled:
+            self.log(f"Stopped extracting {zip_path.name}; its partial output was removed.")
         except zipfile.BadZipFile:
+            self._flag_bad_archive()
             self.log(f"Error: {zip_path.name} is not a valid ZIP file or is corrupted")
         except PermissionError:
             self.log(f"Error: Permission denied accessing {zip_path.name}")
         except Exception as e:
+            if isinstance(e, (MemoryLimitExceeded, MemoryError)):
+                self._flag_bad_archive()
             self.log(f"Error extracting {zip_path.name}: {str(e)}")
 
     def extract_rar(self, rar_path, stop_event=None):
@@ -283,35 +2651,24 @@ class ZipExtractorHandler(FileSystemEventHandler):
                     )
                     return
                 with rarfile.RarFile(rar_path, 'r') as rar_ref:
-                    root_dirs = set()
-                    root_files = set()
-                    for member in rar_ref.namelist():
-                        parts = member.split('/')
-                        if len(parts) == 1 or (len(parts) == 2 and parts[1] == ''):
-                            root_files.add(parts[0])
-                        else:
-                            root_dirs.add(parts[0])
-                    root_dirs = {d for d in root_dirs if any(f.startswith(d + '/') for f in rar_ref.namelist())}
-                    extract_to_downloads = False
-                    if len(root_dirs) == 1 and not root_files:
-                        extract_folder = self.download_folder / list(root_dirs)[0]
-                        rar_ref.extractall(self.download_folder)
-                        extract_to_downloads = True
-                    else:
-                        extract_folder = self.download_folder / rar_path.stem
-                        counter = 1
-                        original_extract_folder = extract_folder
-                        while extract_folder.exists():
-                            extract_folder = Path(f"{original_extract_folder}_{counter}")
-                            counter += 1
-                        rar_ref.extractall(str(extract_folder))
+                    infos = rar_ref.infolist()
+                    extract_root, extract_folder, extract_to_downloads = self._archive_layout(rar_path, infos)
+                    members = self._stream_extract(rar_ref, infos, extract_root, stop_event=stop_event)
+                    del infos
+            except JobCancelled:
+                self.log(f"Stopped extracting {rar_path.name}; its partial output was removed.")
+                return
             except rarfile.NeedFirstVolume:
                 self.log(f"Error: {rar_path.name} is a multi-part RAR archive. Please provide all parts.")
                 return
             except rarfile.Error as e:
+                if isinstance(e, rarfile.BadRarFile):
+                    self._flag_bad_archive()
                 self.log(f"Error: Could not extract {rar_path.name}: {e}")
                 return
             except Exception as e:
+                if isinstance(e, (MemoryLimitExceeded, MemoryError)):
+                    self._flag_bad_archive()
                 self.log(f"Error: Could not open/extract {rar_path.name}: {e}")
                 return
             if extract_to_downloads:
@@ -321,60 +2678,70 @@ class ZipExtractorHandler(FileSystemEventHandler):
                 self.log(f"Successfully extracted to: {extract_folder}")
                 search_folder = extract_folder
             # Copy whole folder if enabled
-            if self.copy_whole_folder:
-                self.log("Copying entire extracted folder to destination (option enabled)...")
-                self._copy_entire_folder(search_folder)
-                # Always try to delete after copying (handled in _copy_entire_folder)
-            else:
-                self.copy_selected_files(search_folder, stop_event=stop_event)
+            if not self._copy_extracted(search_folder, members, stop_event):
+                self.log(f"Stopped processing {rar_path.name}; nothing was delivered and the archive was kept.")
+                return
             self.processed_files.add(rar_path)
             if self.delete_after_zip:
                 try:
                     if rar_path.exists():
-                        rar_path.unlink()
-                        self.log(f"Deleted RAR file: {rar_path}")
+                        self._delete_later(rar_path, "RAR file")
                 except Exception as e:
                     self.log(f"Failed to delete RAR file: {rar_path} ({e})")
         except rarfile.BadRarFile:
+            self._flag_bad_archive()
             self.log(f"Error: {rar_path.name} is not a valid RAR file or is corrupted")
         except PermissionError:
             self.log(f"Error: Permission denied accessing {rar_path.name}")
         except Exception as e:
             self.log(f"Error extracting {rar_path.name}: {str(e)}")
 
-    def copy_selected_files(self, folder, stop_event=None):
+    def _copy_extracted(self, folder, members, stop_event=None):
+        """Run the copy phase; False if it was stopped, in which case nothing was published.
+
+        What the stopped job extracted is removed again, so the retry
+        extracts to the same names instead of a "_1" folder. Files and
+        folders that were there before the job are left alone.
+        """
+        try:
+            # Copy whole folder if enabled
+            if self.copy_whole_folder:
+                self.log("Copying entire extracted folder to destination (option enabled)...")
+                self._copy_entire_folder(folder, stop_event=stop_event)
+                # Always try to delete after copying (handled in _copy_entire_folder)
+            else:
+                self.copy_selected_files(folder, stop_event=stop_event, members=members)
+        except JobCancelled:
+            if self._extracted is not None:
+                _remove_created(*self._extracted)
+            return False
+        return True
+
+    def copy_selected_files(self, folder, stop_event=None, members=None):
+        """Copy the selected files out of an extracted folder.
+
+        ``members`` is what _stream_extract() returned; without it the
+        folder is walked and paths relative to it are matched instead. If
+        stop_event is set, no copy is published and JobCancelled is raised.
+        """
         deleted = False
         copied_any = False
+        if members is None:
+            members = self._folder_members(folder)
         # Each option works independently, both can copy files if both are enabled
         if self.logic_enabled and self.logic_input:
-            copied_any = self._copy_files_with_priority_logic(folder, stop_event=stop_event) or copied_any
-        if self.copy_enabled:
-            for root, dirs, files in os.walk(folder):
-                for file in files:
-                    if stop_event and stop_event.is_set():
-                        self.log("Copying stopped by user.")
-                        return deleted
-                    ext = Path(file).suffix.lower().lstrip(".")
-                    if self.collect_exts is None or ext in self.collect_exts:
-                        src_file = Path(root) / file
-                        dest_file = self.target_folder / file
-                        counter = 1
-                        base_name = dest_file.stem
-                        ext_name = dest_file.suffix
-                        while dest_file.exists():
-                            dest_file = self.target_folder / f"{base_name}_{counter}{ext_name}"
-                            counter += 1
-                        try:
-                            copy2(src_file, dest_file)
-                            self.log(f"Copied: {src_file} -> {dest_file}")
-                            copied_any = True
-                        except Exception as e:
-                            self.log(f"Failed to copy {src_file}: {e}")
+            copied_any = self._copy_files_with_priority_logic(folder, stop_event=stop_event, members=members) or copied_any
+        if self.copy_enabled and not (stop_event and stop_event.is_set()):
+            pairs = [
+                (path, self._unique_dest(path.name))
+                for name, path, size in members if self.copy_rules.matches(name, size)
+            ]
+            self._copy_many(pairs, stop_event=stop_event)
+        # Extracted files may only be deleted once the copies are durable
+        copied_any = any(error is None for _, _, error in self._finish_copies(stop_event)) or copied_any
         if (self.copy_enabled or (self.logic_enabled and self.logic_input)) and self.delete_after_extracted and Path(folder).exists() and copied_any:
             try:
-                import shutil
-                shutil.rmtree(folder)
-                self.log(f"Deleted extracted folder after copying: {folder}")
+                self._delete_later(folder, "extracted folder")
                 deleted = True
             except Exception as e:
                 self.log(f"Failed to delete extracted folder after copying: {folder} ({e})")
@@ -382,7 +2749,19 @@ class ZipExtractorHandler(FileSystemEventHandler):
             self.log("Copying skipped (option not selected).")
         return deleted
 
-    def _copy_files_with_priority_logic(self, folder, stop_event=None):
+    def _folder_members(self, folder):
+        members = []
+        for root, dirs, files in os.walk(folder):
+            for file in files:
+                path = Path(root) / file
+                try:
+                    size = path.stat().st_size
+                except OSError:
+                    continue
+                members.append((path.relative_to(folder).as_posix(), path, size))
+        return members
+
+    def _parse_priority_logic(self):
         logic_input = self.logic_input or ""
         priorities = []
         for part in logic_input.split(";"):
@@ -394,49 +2773,32 @@ class ZipExtractorHandler(FileSystemEventHandler):
                 _, exts = part.split("-", 1)
             else:
                 exts = part
-            ext_list = [e.strip().lstrip(".").lower() for e in exts.split(",") if e.strip()]
+            ext_list = parse_extensions(exts)
             if ext_list:
                 priorities.append(ext_list)
-        if not priorities:
+        return priorities
+
+    def _copy_files_with_priority_logic(self, folder, stop_event=None, members=None):
+        if not self.priority_rules:
             self.log("No valid logic found in input.")
             return False
 
-        self.log(f"Priority logic parsed: {priorities}")
+        self.log(f"Priority logic parsed: {[ext_group for ext_group, _ in self.priority_rules]}")
 
-        # Gather all files in folder (recursively)
-        all_files = []
-        for root, dirs, files in os.walk(folder):
-            for file in files:
-                all_files.append(Path(root) / file)
+        if members is None:
+            members = self._folder_members(folder)
 
         # Try each priority group in order
-        for idx, ext_group in enumerate(priorities):
-            matched_files = []
-            for f in all_files:
-                if stop_event and stop_event.is_set():
-                    self.log("Copying stopped by user.")
-                    return False
-                ext = f.suffix.lower().lstrip(".")
-                if ext in ext_group:
-                    matched_files.append(f)
+        for idx, (ext_group, rules) in enumerate(self.priority_rules):
+            if stop_event and stop_event.is_set():
+                self.log("Copying stopped by user.")
+                return False
+            matched_files = [path for name, path, size in members if rules.matches(name, size)]
             if matched_files:
                 self.log(f"Priority {idx+1}: Found files with extensions {ext_group}:")
-                for src_file in matched_files:
-                    if stop_event and stop_event.is_set():
-                        self.log("Copying stopped by user.")
-                        return False
-                    dest_file = self.target_folder / src_file.name
-                    counter = 1
-                    base_name = dest_file.stem
-                    ext_name = dest_file.suffix
-                    while dest_file.exists():
-                        dest_file = self.target_folder / f"{base_name}_{counter}{ext_name}"
-                        counter += 1
-                    try:
-                        copy2(src_file, dest_file)
-                        self.log(f"Copied: {src_file} -> {dest_file}")
-                    except Exception as e:
-                        self.log(f"Failed to copy {src_file}: {e}")
+                pairs = [(src_file, self._unique_dest(src_file.name)) for src_file in matched_files]
+                if not self._copy_many(pairs, stop_event=stop_event):
+                    return False
                 self.log(f"Stopped at priority {idx+1}, no lower priorities will be checked.")
                 return True
             else:
@@ -444,27 +2806,498 @@ class ZipExtractorHandler(FileSystemEventHandler):
         self.log("No files matched any priority group. Nothing copied.")
         return False
 
-    def _copy_entire_folder(self, src_folder):
+    def _read_member_infos(self, archive_path):
+        ext = archive_path.suffix.lower()
+        if ext == '.zip':
+            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+                return zip_ref.infolist()
+        if ext == '.rar':
+            if not rarfile:
+                raise RuntimeError("rarfile module not installed")
+            with rarfile.RarFile(archive_path, 'r') as rar_ref:
+                return rar_ref.infolist()
+        raise ValueError(f"not a supported archive: {archive_path.name}")
+
+    def plan_archive(self, archive_path, state=None):
+        """Work out what processing an archive would do, without extracting or writing anything.
+
+        Only the archive's central directory is read. ``state`` carries the
+        names already planned when several archives are planned in a row.
+        """
+        archive_path = Path(archive_path)
+        if state is None:
+            state = self._new_plan_state()
+        plan = ArchivePlan(archive_path)
+        try:
+            infos = self._read_member_infos(archive_path)
+        except Exception as e:
+            plan.error = e
+            return plan
+        extract_root, extract_folder, plan.extract_to_downloads = self._archive_layout(archive_path, infos, state["folders"])
+        state["folders"].add(extract_folder)
+        plan.extract_folder = extract_folder
+        files = []
+        skipped = 0
+        for info in infos:
+            target = self._member_target(extract_root, info.filename)
+            if target is None or info.is_dir():
+                continue
+            if self.copy_rules.excluded(info.filename, info.file_size):
+                skipped += 1
+                continue
+            plan.extract.append((info.filename, target, info.file_size))
+            files.append((info.filename, target, info.file_size))
+        del infos
+        if skipped:
+            plan.notes.append(f"{skipped} file(s) excluded by selection rules are not extracted")
+
+        copied_any = False
+        if self.copy_whole_folder:
+            dest = self.target_folder / extract_folder.name
+            counter = 1
+            while self._plan_taken(dest, state):
+                dest = self.target_folder / f"{extract_folder.stem}_{counter}{extract_folder.suffix}"
+                counter += 1
+            state["names"].add(os.path.normcase(dest.name))
+            for name, target, size in files:
+                plan.copies.append((target, dest / target.relative_to(extract_folder), size))
+            copied_any = True
+        else:
+            if self.logic_enabled and self.logic_input:
+                for idx, (ext_group, rules) in enumerate(self.priority_rules):
+                    matched = [(t, s) for n, t, s in files if rules.matches(n, s)]
+                    if matched:
+                        plan.notes.append(f"priority {idx+1} ({', '.join(ext_group)}) matches {len(matched)} file(s)")
+                        for target, size in matched:
+                            plan.copies.append((target, self._plan_dest(target.name, state), size))
+                        copied_any = True
+                        break
+                else:
+                    plan.notes.append("no files match any priority group")
+            if self.copy_enabled:
+                for name, target, size in files:
+                    if self.copy_rules.matches(name, size):
+                        plan.copies.append((target, self._plan_dest(target.name, state), size))
+                        copied_any = True
+            if not self.copy_enabled and not (self.logic_enabled and self.logic_input):
+                plan.notes.append("copying skipped (option not selected)")
+        if self.delete_after_extracted and copied_any:
+            plan.deletions.append(extract_folder)
+        if self.delete_after_zip:
+            plan.deletions.append(archive_path)
+        return plan
+
+    def plan_folder(self, folder=None):
+        """Plan every archive in a folder (the monitored folder by default), in processing order."""
+        folder = Path(folder or self.download_folder)
+        state = self._new_plan_state()
+        archives = sorted(
+            (Path(entry.path) for entry in os.scandir(folder)
+             if entry.is_file() and Path(entry.name).suffix.lower() in self.archive_exts),
+            key=lambda p: archive_sort_key(p, self.scheduler.order)
+        )
+        return [self.plan_archive(archive, state) for archive in archives]
+
+    def _new_plan_state(self):
+        try:
+            existing = {os.path.normcase(name) for name in os.listdir(self.target_folder)}
+        except OSError:
+            existing = set()
+        return {"folders": set(), "names": existing}
+
+    def _plan_taken(self, dest, state):
+        return os.path.normcase(dest.name) in state["names"]
+
+    def _plan_dest(self, name, state):
+        # Mirrors _unique_dest() against a listing taken once instead of per-file stat calls
+        dest_file = self.target_folder / name
+        counter = 1
+        base_name = dest_file.stem
+        ext_name = dest_file.suffix
+        while self._plan_taken(dest_file, state):
+            dest_file = self.target_folder / f"{base_name}_{counter}{ext_name}"
+            counter += 1
+        state["names"].add(os.path.normcase(dest_file.name))
+        return dest_file
+
+    def _copy_many(self, pairs, stop_event=None):
+        """Copy already-reserved (src, dest) pairs with ``copy_concurrency`` threads.
+
+        Destination directories are created in one pass up front. Returns
+        False if stop_event was set before every file had been started.
+        """
+        if not pairs:
+            return True
+        for folder in sorted({dest.parent for _, dest in pairs}):
+            folder.mkdir(parents=True, exist_ok=True)
+        total = 0
+        for src_file, _ in pairs:
+            try:
+                total += os.path.getsize(src_file)
+            except OSError:
+                pass
+        progress = self._byte_progress("copying", total)
+        pending = iter(pairs)
+        lock = threading.Lock()
+        copied = [0]
+
+        def worker(pooled=False):
+            # Pool threads start at normal priority; the scheduler thread has already lowered its own
+            if pooled and self.io_low_priority:
+                lower_io_priority()
+            while not (stop_event and stop_event.is_set()):
+                with lock:
+                    pair = next(pending, None)
+                if pair is None:
+                    return
+                src_file, dest_file = pair
+                try:
+                    self._copy_file(src_file, dest_file, stop_event=stop_event, progress=progress)
+                    with lock:
+                        copied[0] += 1
+                except JobCancelled:
+                    return
+                except Exception as e:
+                    self.log(f"Failed to copy {src_file}: {e}")
+
+        started = time.perf_counter()
+        workers = min(self.copy_concurrency, len(pairs))
+        if workers <= 1:
+            worker()
+        else:
+            threads = [threading.Thread(target=worker, args=(True,), daemon=True) for _ in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        if len(pairs) > 1:
+            self.log(f"Copied {copied[0]} file(s) in {elapsed:.2f}s ({copied[0] / elapsed:.1f} files/s, {workers} thread(s)).")
+        if stop_event and stop_event.is_set():
+            self.log("Copying stopped by user; none of this archive's copies will be delivered.")
+            return False
+        progress.finish()
+        return True
+
+    def _copy_entire_folder(self, src_folder, stop_event=None):
         import shutil
         dest = self.target_folder / Path(src_folder).name
         counter = 1
         orig_dest = dest
-        while dest.exists():
-            dest = self.target_folder / f"{orig_dest.stem}_{counter}{orig_dest.suffix}"
-            counter += 1
+        self.target_folder.mkdir(parents=True, exist_ok=True)
+        while True:
+            # mkdir() claims the name, so another writer cannot pick the same folder
+            try:
+                dest.mkdir()
+                break
+            except FileExistsError:
+                dest = self.target_folder / f"{orig_dest.stem}_{counter}{orig_dest.suffix}"
+                counter += 1
         try:
-            shutil.copytree(src_folder, dest)
+            dirs = []
+            pairs = []
+            for root, _, files in os.walk(src_folder):
+                rel = Path(root).relative_to(src_folder)
+                dirs.append((Path(root), dest / rel))
+                pairs.extend((Path(root) / file, dest / rel / file) for file in files)
+            for _, folder in dirs:
+                folder.mkdir(parents=True, exist_ok=True)
+            try:
+                self._copy_many(pairs, stop_event=stop_event)
+            except BaseException:
+                self.writer.abort()
+                raise
+            try:
+                results = self._finish_copies(stop_event, log_copies=False)
+            except JobCancelled:
+                # Only empty folders are left once the copies are discarded
+                for _, folder in reversed(dirs):
+                    try:
+                        folder.rmdir()
+                    except OSError:
+                        pass
+                raise
+            failed = sum(1 for _, _, error in results if error is not None)
+            if failed:
+                raise OSError(f"{failed} file(s) could not be written")
+            # Directory timestamps last, as copytree() does
+            for src_dir, dest_dir in reversed(dirs):
+                try:
+                    shutil.copystat(src_dir, dest_dir)
+                except OSError:
+                    pass
             self.log(f"Copied entire folder: {src_folder} -> {dest}")
             # Always delete extracted folder after copying if option is enabled
             if self.delete_after_extracted and Path(src_folder).exists():
                 try:
-                    shutil.rmtree(src_folder)
-                    self.log(f"Deleted extracted folder after copying: {src_folder}")
+                    self._delete_later(src_folder, "extracted folder")
                 except Exception as e:
                     self.log(f"Failed to delete extracted folder after copying: {src_folder} ({e})")
+        except JobCancelled:
+            raise
         except Exception as e:
             self.log(f"Failed to copy entire folder: {src_folder} -> {dest}: {e}")
 
+class ExtractionJob:
+    """Awaitable handle for one archive submitted to an ExtractionEngine.
+
+    ``await job`` gives the stats dict from process_archive() (delivered
+    files, bytes and timing); ``async for event in job.events()`` yields
+    progress events until the job is done.
+    """
+    def __init__(self, archive_path, loop):
+        self.archive_path = Path(archive_path)
+        self.stop_event = threading.Event()
+        self.log = []
+        self._loop = loop
+        self._events = asyncio.Queue()
+        self._task = None
+
+    def __await__(self):
+        return self._task.__await__()
+
+    def done(self):
+        return self._task is not None and self._task.done()
+
+    def cancel(self):
+        """Ask the running job to stop within one buffer; whatever it extracted or copied is removed."""
+        self.stop_event.set()
+
+    async def events(self):
+        while True:
+            event = await self._events.get()
+            yield event
+            if event.get("stage") == "finished":
+                return
+
+    def _emit(self, event):
+        # Called from executor threads
+        self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+
+    def _log(self, msg):
+        self.log.append(msg)
+        self._emit({"stage": "log", "message": msg})
+
+class ExtractionEngine:
+    """asyncio front end for driving the extractor from another service.
+
+        engine = ExtractionEngine(max_concurrency=8)
+        job = engine.submit("in/a.zip", {"target_folder": "out", "file_exts": "png"})
+        stats = await job
+
+    ``rules`` are ZipExtractorHandler keyword arguments plus ``target_folder``
+    and optionally ``download_folder`` (defaults to the archive's folder).
+    Blocking work runs in a thread pool, at most ``max_concurrency`` jobs at once.
+    """
+    def __init__(self, max_concurrency=4, executor=None):
+        self.max_concurrency = max_concurrency
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="unzipper")
+        self._semaphore = None
+
+    def submit(self, archive_path, rules):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        job = ExtractionJob(archive_path, loop)
+        job._task = loop.create_task(self._run(job, dict(rules)))
+        return job
+
+    async def _run(self, job, rules):
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            handler = None
+            try:
+                # Bad rules (e.g. a misspelled keyword) fail the job, but still end its events()
+                target_folder = rules.pop("target_folder")
+                download_folder = rules.pop("download_folder", job.archive_path.parent)
+                handler = await loop.run_in_executor(self._executor, lambda: ZipExtractorHandler(
+                    download_folder, target_folder, gui_callback=job._log, progress_callback=job._emit, **rules))
+                stats = await loop.run_in_executor(self._executor, handler.process_archive, job.archive_path, job.stop_event)
+            finally:
+                if handler is not None:
+                    handler.stop()
+                job._emit({"stage": "finished"})
+        return stats
+
+    async def close(self):
+        if self._own_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+LOAD_TEST_MODES = ("crdownload", "grow")
+
+def _percentile(values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))]
+
+class LoadTest:
+    """Simulates download bursts into a temporary monitored folder and times each archive to delivery.
+
+    Archives arrive at ``rate`` per second on average (exponential gaps,
+    so arrivals bunch up like real downloads) and are written slowly over
+    ``grow_seconds``: either as ``.crdownload`` files renamed when complete
+    (mode "crdownload", like Chrome) or growing in place under their final
+    name (mode "grow"). Latency runs from the moment the archive is
+    complete under its final name until its files are in the target
+    folder, and is split into the stages the handler reports: event
+    delivery and coalescing, the wait in the scheduler queue, the
+    readiness wait in _wait_until_file_ready(), and extraction/copying.
+    """
+    STAGES = (("queued", "events"), ("dequeued", "queue"), ("started", "ready wait"), ("done", "processing"))
+
+    def __init__(self, count=20, rate=2.0, size=1024 * 1024, members=4, mode="crdownload", grow_seconds=1.0,
+                 isolated=False, timeout=None):
+        if mode not in LOAD_TEST_MODES:
+            raise ValueError(f"unknown load test mode: {mode}")
+        self.count = max(1, int(count))
+        self.rate = float(rate)
+        self.size = max(1024, int(size))
+        self.members = max(1, int(members))
+        self.mode = mode
+        self.grow_seconds = float(grow_seconds)
+        self.isolated = isolated
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+        self.times = {}
+        self.results = {}
+        self.errors = []
+        self.completed = False
+
+    def _payload(self, index):
+        buf = io.BytesIO()
+        member_size = self.size // self.members
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for m in range(self.members):
+                # Half random, half repetitive: roughly 2:1 compression, like typical assets
+                half = member_size // 2
+                zf.writestr(f"load{index:05d}/file_{m}.bin", os.urandom(half) + bytes(member_size - half))
+        return buf.getvalue()
+
+    def _write_archive(self, folder, index):
+        name = f"load{index:05d}.zip"
+        final = folder / name
+        data = self._payload(index)
+        path = folder / (name + ".crdownload") if self.mode == "crdownload" else final
+        steps = 10
+        step = -(-len(data) // steps)
+        with open(path, "wb") as f:
+            for start in range(0, len(data), step):
+                f.write(data[start:start + step])
+                f.flush()
+                time.sleep(self.grow_seconds / steps)
+        if path != final:
+            os.replace(path, final)
+        with self._lock:
+            self.times.setdefault(name, {})["closed"] = time.perf_counter()
+            self.results.setdefault(name, {"bytes": len(data)})
+
+    def _on_progress(self, info):
+        archive = info.get("archive")
+        if not archive:
+            return
+        name = Path(archive).name
+        with self._lock:
+            self.times.setdefault(name, {}).setdefault(info["stage"], time.perf_counter())
+            if info["stage"] == "done":
+                self.results.setdefault(name, {})["ok"] = info.get("ok", False)
+                if sum(1 for r in self.results.values() if "ok" in r) >= self.count:
+                    self._all_done.set()
+
+    def _on_log(self, msg):
+        if msg.startswith("Error") or msg.startswith("Failed"):
+            with self._lock:
+                self.errors.append(msg)
+
+    def run(self):
+        import random
+        import tempfile
+        with tempfile.TemporaryDirectory(prefix="unzipper-load-") as tmp:
+            monitor, target = Path(tmp) / "downloads", Path(tmp) / "target"
+            monitor.mkdir()
+            supervisor = ExtractionSupervisor() if self.isolated else None
+            handler = ZipExtractorHandler(
+                monitor, target, file_exts="bin", gui_callback=self._on_log, progress_callback=self._on_progress,
+                cleanup_queue=CleanupQueue(path=Path(tmp) / "cleanup.json"), isolation=supervisor
+            )
+            observer = Observer()
+            observer.schedule(handler, str(monitor), recursive=False)
+            observer.start()
+            writers = []
+            self.started = time.perf_counter()
+            try:
+                for index in range(self.count):
+                    writer = threading.Thread(target=self._write_archive, args=(monitor, index), daemon=True)
+                    writer.start()
+                    writers.append(writer)
+                    if self.rate > 0 and index < self.count - 1:
+                        time.sleep(random.expovariate(self.rate))
+                for writer in writers:
+                    writer.join()
+                timeout = self.timeout if self.timeout is not None else 60 + self.count * 10
+                self.completed = self._all_done.wait(timeout)
+                self.finished = time.perf_counter()
+            finally:
+                observer.stop()
+                observer.join()
+                handler.stop()
+                if supervisor is not None:
+                    supervisor.close()
+        return self
+
+    def describe(self):
+        """Report lines: latency percentiles overall and per stage, throughput and the likely bottleneck."""
+        with self._lock:
+            times = {name: dict(t) for name, t in self.times.items()}
+            results = {name: dict(r) for name, r in self.results.items()}
+        delivered = [name for name, r in results.items() if r.get("ok") and "closed" in times.get(name, {})]
+        lines = [f"Load test: {self.count} archive(s) of {format_size(self.size)} ({self.members} member(s)), "
+                 f"mode {self.mode}, {self.rate:g}/s offered, {self.grow_seconds:g}s growth"
+                 + (", worker processes" if self.isolated else "")]
+        failed = self.count - len(delivered)
+        if failed:
+            lines.append(f"  {failed} archive(s) not delivered" + ("" if self.completed else " before the timeout"))
+        for msg in self.errors[:5]:
+            lines.append(f"  {msg}")
+        if not delivered:
+            return lines
+
+        def summary(label, values):
+            values = sorted(values)
+            return (f"  {label:<11} p50 {_percentile(values, 50):7.2f}s  p95 {_percentile(values, 95):7.2f}s  "
+                    f"p99 {_percentile(values, 99):7.2f}s  max {values[-1]:7.2f}s")
+
+        lines.append(summary("latency", [times[n]["done"] - times[n]["closed"] for n in delivered]))
+        means = {}
+        previous = "closed"
+        for stage, label in self.STAGES:
+            spans = [max(0.0, times[n][stage] - times[n][previous]) for n in delivered if stage in times[n] and previous in times[n]]
+            if spans:
+                lines.append(summary(label, spans))
+                means[label] = sum(spans) / len(spans)
+            previous = stage
+        first = min(times[n]["closed"] for n in delivered)
+        last = max(times[n]["done"] for n in delivered)
+        span = max(last - first, 1e-9)
+        total = sum(results[n].get("bytes", 0) for n in delivered)
+        lines.append(f"  throughput  {len(delivered) / span:.2f} archives/s, {total / span / (1024 * 1024):.1f} MB/s of archives")
+        per_job = means.get("ready wait", 0.0) + means.get("processing", 0.0)
+        if per_job:
+            # Archives are handled one at a time, so each costs its ready wait plus its processing time
+            lines.append(f"  serial capacity {1 / per_job:.2f} archives/s "
+                         f"({means.get('ready wait', 0.0):.2f}s ready wait + {means.get('processing', 0.0):.2f}s processing per archive)")
+            if means.get("ready wait", 0.0) > means.get("processing", 0.0):
+                job_cost = "the readiness wait (_wait_until_file_ready)"
+            else:
+                job_cost = "extraction and copying"
+            if means.get("queue", 0.0) > per_job:
+                lines.append(f"  bottleneck: arrivals outpace serial processing, so archives queue behind one another; each job is mostly {job_cost}")
+            else:
+                lines.append(f"  bottleneck: {job_cost}")
+        return lines
+
 class UnzipperGUI:
     def __init__(self, root):
         self.root = root
@@ -486,8 +3319,8 @@ class UnzipperGUI:
         # --- REDESIGN: Clean, modern, non-transparent UI ---
         # Remove transparency and set a solid background
         self.root.configure(bg="#f4f6fb")
-        self.root.geometry("920x620")
-        self.root.minsize(920, 620)
+        self.root.geometry("920x740")
+        self.root.minsize(920, 740)
         self.root.title("Unzipper")
         # Remove any transparency attributes
         try:
@@ -618,6 +3451,31 @@ class UnzipperGUI:
         )
         self.copy_whole_folder_chk.grid(row=2, column=0, padx=(0, 8), pady=(2, 0), sticky="w", columnspan=3)
 
+        # --- Fourth row: selection rules (globs, size bounds, excludes) ---
+        tk.Label(ext_logic_frame, text="Rules:", bg="#ffffff", fg="#333", font=("Segoe UI", 11)).grid(row=3, column=1, sticky="e")
+        self.select_rules_var = tk.StringVar()
+        self.select_rules_entry = tk.Entry(ext_logic_frame, textvariable=self.select_rules_var, width=60, font=("Segoe UI", 11), bg="#f7fafd", relief="flat", highlightthickness=1, highlightbackground="#bdbdbd")
+        self.select_rules_entry.grid(row=3, column=2, columnspan=1, sticky="ew", pady=(2, 0))
+        def show_rules_tip(event):
+            self.rules_tip = tk.Toplevel(self.select_rules_entry)
+            self.rules_tip.wm_overrideredirect(True)
+            self.rules_tip.wm_geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
+            tk.Label(
+                self.rules_tip,
+                text="Selection rules, checked before extracting.\n\nExample: */renders/*.png >1MB; exclude __MACOSX/; !*.tmp\n\nSemicolon separates rules. 'exclude' or '!' drops matching files\n(they are not even extracted); other rules add files to copy.\nSize bounds: >, >=, <, <= with KB/MB/GB.",
+                background="#ffffe0",
+                relief='solid',
+                borderwidth=1,
+                font=("Segoe UI", 9, "normal"),
+                justify="left"
+            ).pack(ipadx=1)
+        def hide_rules_tip(event):
+            if hasattr(self, "rules_tip"):
+                self.rules_tip.destroy()
+                del self.rules_tip
+        self.select_rules_entry.bind("<Enter>", show_rules_tip)
+        self.select_rules_entry.bind("<Leave>", hide_rules_tip)
+
         # Delete and startup options
         options_frame = section_frame(main_frame)
         self.delete_zip_var = tk.BooleanVar()
@@ -632,6 +3490,27 @@ class UnzipperGUI:
         self.tray_btn = tk.Button(options_frame, text="Minimize to Tray", command=self.hide_window_to_tray)
         self.tray_btn.pack(side=tk.LEFT, padx=(0, 8))
 
+        # I/O limits (per pipeline) and job ordering, adjustable while running
+        self.io_governors = {"monitor": IOGovernor(), "extract_all": IOGovernor()}
+        io_frame = section_frame(main_frame)
+        tk.Label(io_frame, text="Read MB/s:", bg="#ffffff", fg="#333", font=("Segoe UI", 11)).pack(side=tk.LEFT, padx=(0, 4))
+        self.io_read_var = tk.StringVar(value="0")
+        self.io_read_entry = tk.Entry(io_frame, textvariable=self.io_read_var, width=6, font=("Segoe UI", 11))
+        self.io_read_entry.pack(side=tk.LEFT, padx=(0, 12))
+        tk.Label(io_frame, text="Write MB/s:", bg="#ffffff", fg="#333", font=("Segoe UI", 11)).pack(side=tk.LEFT, padx=(0, 4))
+        self.io_write_var = tk.StringVar(value="0")
+        self.io_write_entry = tk.Entry(io_frame, textvariable=self.io_write_var, width=6, font=("Segoe UI", 11))
+        self.io_write_entry.pack(side=tk.LEFT, padx=(0, 12))
+        tk.Label(io_frame, text="Order:", bg="#ffffff", fg="#333", font=("Segoe UI", 11)).pack(side=tk.LEFT, padx=(0, 4))
+        self.schedule_order_var = tk.StringVar(value="fifo")
+        self.schedule_order_menu = tk.OptionMenu(io_frame, self.schedule_order_var, *SCHEDULE_ORDERS)
+        self.schedule_order_menu.pack(side=tk.LEFT, padx=(0, 12))
+        self.io_low_priority_var = tk.BooleanVar(value=False)
+        self.io_low_priority_chk = tk.Checkbutton(io_frame, text="Low I/O priority", variable=self.io_low_priority_var, bg="#ffffff", font=("Segoe UI", 11), activebackground="#e3f2fd", selectcolor="#e3f2fd", command=self.restart_monitoring)
+        self.io_low_priority_chk.pack(side=tk.LEFT, padx=(0, 12))
+        self.io_apply_btn = tk.Button(io_frame, text="Apply", command=self.apply_io_limits)
+        self.io_apply_btn.pack(side=tk.LEFT)
+
         # Action buttons
         btn_frame = section_frame(main_frame)
         self.start_btn = tk.Button(btn_frame, text="Start Monitoring", command=self.start_monitoring)
@@ -645,6 +3524,22 @@ class UnzipperGUI:
         self.extract_all_btn.pack(side=tk.LEFT, padx=(0, 8))
         self.stop_extract_all_btn = tk.Button(btn_frame, text="Stop Extracting", command=self.stop_extract_all, state=tk.DISABLED)
         self.stop_extract_all_btn.pack(side=tk.LEFT, padx=(0, 8))
+        self.dry_run_btn = tk.Button(btn_frame, text="Dry Run", command=self.dry_run)
+        self.dry_run_btn.pack(side=tk.LEFT, padx=(0, 8))
+        # Byte-level progress of the job in progress
+        self.progress_var = tk.StringVar()
+        self.progress_label = tk.Label(btn_frame, textvariable=self.progress_var, bg="#ffffff", fg="#555", font=("Segoe UI", 10), anchor="w")
+        self.progress_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # Catalog search: which archive did a file come from?
+        search_frame = section_frame(main_frame)
+        tk.Label(search_frame, text="Find file:", bg="#ffffff", fg="#333", font=("Segoe UI", 11)).pack(side=tk.LEFT, padx=(0, 4))
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, width=40, font=("Segoe UI", 11))
+        self.search_entry.pack(side=tk.LEFT, padx=(0, 8), fill=tk.X, expand=True)
+        self.search_entry.bind("<Return>", self.search_catalog)
+        self.search_btn = tk.Button(search_frame, text="Search Catalog", command=self.search_catalog)
+        self.search_btn.pack(side=tk.LEFT)
 
         # Log area
         self.log_area = scrolledtext.ScrolledText(main_frame, state='disabled', height=12, font=("Consolas", 11), bg="#f7fafd", fg="#222", relief="flat", highlightthickness=1, highlightbackground="#bdbdbd", bd=0)
@@ -683,6 +3578,10 @@ class UnzipperGUI:
         self.dest_entry.config(**entry_style)
         self.ext_entry.config(**entry_style)
         self.copy_logic_entry.config(**entry_style)
+        self.select_rules_entry.config(**entry_style)
+        self.io_read_entry.config(**entry_style)
+        self.io_write_entry.config(**entry_style)
+        self.search_entry.config(**entry_style)
 
         # Style all buttons
         def style_button(btn, small=False):
@@ -691,7 +3590,7 @@ class UnzipperGUI:
                 btn.config(relief="solid", bd=1, padx=10, pady=2, font=("Segoe UI", 10 if small else 11, "bold"), highlightbackground="#bdbdbd", highlightthickness=2, height=1)
             else:
                 btn.config(relief="solid", bd=1, padx=10, pady=2, font=("Segoe UI", 10 if small else 11, "bold"), highlightbackground="#bdbdbd", highlightthickness=2)
-        for btn in [self.start_btn, self.stop_btn, self.extract_all_btn, self.stop_extract_all_btn, self.tray_btn, self.monitor_select_btn, self.dest_select_btn]:
+        for btn in [self.start_btn, self.stop_btn, self.extract_all_btn, self.stop_extract_all_btn, self.tray_btn, self.monitor_select_btn, self.dest_select_btn, self.io_apply_btn, self.search_btn]:
             style_button(btn, small=True)
         for child in btn_frame.winfo_children():
             if isinstance(child, tk.Button) and child not in [self.start_btn, self.stop_btn, self.extract_all_btn, self.stop_extract_all_btn, self.tray_btn, self.monitor_select_btn, self.dest_select_btn]:
@@ -712,11 +3611,11 @@ class UnzipperGUI:
         main_frame.pack_configure(padx=0, pady=0)
 
         # Style checkboxes
-        for chk in [self.copy_chk, self.copy_logic_chk, self.copy_whole_folder_chk, self.delete_zip_chk, self.delete_extracted_chk, self.startup_chk]:
+        for chk in [self.copy_chk, self.copy_logic_chk, self.copy_whole_folder_chk, self.delete_zip_chk, self.delete_extracted_chk, self.startup_chk, self.io_low_priority_chk]:
             chk.config(bg="#ffffff", activebackground="#e3f2fd", selectcolor="#e3f2fd", font=("Segoe UI", 11))
 
         # Style labels
-        for f in [main_frame, folder_frame, folder2_frame, ext_logic_frame, options_frame]:
+        for f in [main_frame, folder_frame, folder2_frame, ext_logic_frame, options_frame, io_frame, search_frame]:
             for child in f.winfo_children():
                 if isinstance(child, tk.Label):
                     child.config(bg="#ffffff", font=("Segoe UI", 11, "bold"), fg="#333")
@@ -727,6 +3626,21 @@ class UnzipperGUI:
         # Ensure tray_icon is always defined
         self.tray_icon = None
 
+        # Resume deletions left pending by a previous run
+        self.cleanup = get_cleanup_queue()
+        self.cleanup.log = self.log
+        if self.cleanup.pending():
+            self.log(f"Resuming {self.cleanup.pending()} pending deletion(s).")
+            self.cleanup.start()
+
+        # Member catalog written as archives are processed
+        self.catalog = None
+        if self.catalog_enabled:
+            try:
+                self.catalog = ArchiveCatalog()
+            except sqlite3.Error as e:
+                self.log(f"Archive catalog unavailable: {e}")
+
         # Start monitoring automatically after UI setup and config load
         self.start_monitoring()
 
@@ -766,7 +3680,24 @@ class UnzipperGUI:
             file_exts, logic_input,
             copy_enabled=copy_enabled,
             logic_enabled=logic_enabled,
-            copy_whole_folder=copy_whole_folder
+            copy_whole_folder=copy_whole_folder,
+            io_read_limit=self.io_read_var.get(),
+            io_write_limit=self.io_write_var.get(),
+            io_low_priority=self.io_low_priority_var.get(),
+            schedule_order=self.schedule_order_var.get(),
+            select_rules=self.select_rules_var.get(),
+            buffer_kb=self.buffer_kb,
+            memory_limit_mb=self.memory_limit_mb,
+            deflate_backend=self.deflate_backend,
+            copy_concurrency=self.copy_concurrency,
+            worker_processes=self.worker_processes,
+            job_timeout_s=self.job_timeout_s,
+            job_cpu_s=self.job_cpu_s,
+            worker_max_jobs=self.worker_max_jobs,
+            catalog=self.catalog_enabled,
+            multi_instance=self.multi_instance,
+            instance_id=self.instance_id,
+            lease_ttl_s=self.lease_ttl_s
         )
         self.log("Configuration saved.")
 
@@ -790,6 +3721,31 @@ class UnzipperGUI:
             self.copy_logic_enabled_var.set(config["logic_enabled"].lower() == "true")
         if "copy_whole_folder" in config:
             self.copy_whole_folder_var.set(config["copy_whole_folder"].lower() == "true")
+        if "io_read_limit" in config:
+            self.io_read_var.set(config["io_read_limit"])
+        if "io_write_limit" in config:
+            self.io_write_var.set(config["io_write_limit"])
+        if "io_low_priority" in config:
+            self.io_low_priority_var.set(config["io_low_priority"].lower() == "true")
+        if config.get("schedule_order") in SCHEDULE_ORDERS:
+            self.schedule_order_var.set(config["schedule_order"])
+        if "select_rules" in config:
+            self.select_rules_var.set(config["select_rules"])
+        # Settings without a widget; edit unzipper_config.txt to change them
+        self.buffer_kb = config.get("buffer_kb", "1024")
+        self.memory_limit_mb = config.get("memory_limit_mb", "0")
+        self.deflate_backend = config.get("deflate_backend", "auto")
+        self.copy_concurrency = config.get("copy_concurrency", "4")
+        self.worker_processes = config.get("worker_processes", "1")
+        self.job_timeout_s = config.get("job_timeout_s", "1800")
+        self.job_cpu_s = config.get("job_cpu_s", "0")
+        self.worker_max_jobs = config.get("worker_max_jobs", "50")
+        self.catalog_enabled = config.get("catalog", "True").lower() == "true"
+        self.multi_instance = config.get("multi_instance", "False").lower() == "true"
+        # Unset means host-pid (see LeaseManager), so two instances on one machine never share an id
+        self.instance_id = config.get("instance_id") or None
+        self.lease_ttl_s = config.get("lease_ttl_s", "60")
+        self._update_io_governors()
 
     def start_monitoring(self):
         monitor_folder = self.monitor_var.get()
@@ -808,6 +3764,8 @@ class UnzipperGUI:
             messagebox.showerror("Error", "Selected folders do not exist.")
             return
         self.save_config()
+        self.snapshot = self._get_snapshot(monitor_folder)
+        self.in_flight = getattr(self, "in_flight", None) or InFlightRegistry()
         self.handler = ZipExtractorHandler(
             monitor_folder, dest_folder,
             delete_after_zip=delete_after_zip,
@@ -817,7 +3775,16 @@ class UnzipperGUI:
             copy_enabled=copy_enabled,
             logic_input=logic_input,
             logic_enabled=logic_enabled,
-            copy_whole_folder=copy_whole_folder
+            copy_whole_folder=copy_whole_folder,
+            governor=self.io_governors["monitor"],
+            schedule_order=self.schedule_order_var.get(),
+            io_low_priority=self.io_low_priority_var.get(),
+            snapshot=self.snapshot,
+            in_flight=self.in_flight,
+            select_rules=self.select_rules_var.get(),
+            progress_callback=self._on_job_progress,
+            leases=self._get_leases(monitor_folder),
+            **self._advanced_settings()
         )
         self.observer = Observer()
         self.observer.schedule(self.handler, str(monitor_folder), recursive=False)
@@ -828,9 +3795,34 @@ class UnzipperGUI:
         self.log("Watching for new ZIP files... (Press Stop Monitoring to stop)")
         threading.Thread(target=self._run_observer, daemon=True).start()
 
+    def _get_leases(self, monitor_folder):
+        # With multi_instance on, instances watching the same (network) folder split the archives between them
+        if not self.multi_instance:
+            return None
+        leases = getattr(self, "leases", None)
+        if leases is None or leases.folder.parent != Path(monitor_folder):
+            if leases is not None:
+                leases.close()
+            try:
+                ttl = float(self.lease_ttl_s)
+            except ValueError:
+                ttl = 60
+            leases = LeaseManager(monitor_folder, instance_id=self.instance_id, ttl=ttl)
+            leases.log = self.log
+            self.leases = leases
+        return leases
+
+    def _get_snapshot(self, monitor_folder):
+        # One snapshot per monitored folder, shared by monitoring and Extract All
+        snapshot = getattr(self, "snapshot", None)
+        if snapshot is None or snapshot.key != os.path.normcase(os.path.abspath(monitor_folder)):
+            snapshot = DirectorySnapshot(monitor_folder, {'.zip', '.rar'})
+        return snapshot
+
     def _run_observer(self):
         self.observer.start()
         try:
+            self.handler.catch_up()
             while self.monitoring:
                 time.sleep(1)
         except Exception as e:
@@ -838,6 +3830,12 @@ class UnzipperGUI:
         finally:
             self.observer.stop()
             self.observer.join()
+            self.handler.stop()
+            merged, refused = self.handler.duplicate_stats()
+            if merged or refused:
+                self.log(f"Duplicate suppression: {merged} event(s) merged, {refused} duplicate job(s) skipped.")
+            if self.handler.isolation is not None:
+                self.log(self.handler.isolation.report())
             self.log("ZIP file monitor stopped.")
 
     def stop_monitoring(self):
@@ -846,6 +3844,62 @@ class UnzipperGUI:
         self.stop_btn.config(state=tk.DISABLED)
         self.log("Stopping ZIP file monitor...")
 
+    def _advanced_settings(self):
+        try:
+            buffer_size = int(float(self.buffer_kb) * 1024)
+        except ValueError:
+            buffer_size = COPY_CHUNK_SIZE
+        try:
+            memory_limit = int(float(self.memory_limit_mb) * 1024 * 1024)
+        except ValueError:
+            memory_limit = 0
+        try:
+            copy_concurrency = max(1, int(self.copy_concurrency))
+        except ValueError:
+            copy_concurrency = 4
+        return {"buffer_size": buffer_size, "memory_limit": memory_limit, "deflate_backend": self.deflate_backend,
+                "copy_concurrency": copy_concurrency, "isolation": self._get_supervisor(memory_limit),
+                "catalog": getattr(self, "catalog", None)}
+
+    def _get_supervisor(self, memory_limit=0):
+        # Shared by monitoring and Extract All; worker_processes=0 keeps extraction in-process
+        try:
+            settings = (int(self.worker_processes), float(self.job_timeout_s), int(float(self.job_cpu_s)),
+                        memory_limit, int(self.worker_max_jobs))
+        except ValueError:
+            settings = (1, 1800.0, 0, memory_limit, 50)
+        supervisor = getattr(self, "supervisor", None)
+        if supervisor is not None and getattr(self, "_supervisor_settings", None) == settings:
+            return supervisor
+        if supervisor is not None:
+            supervisor.close()
+        workers, job_timeout, cpu_timeout, memory_limit, max_jobs = settings
+        self.supervisor = None
+        if workers > 0:
+            self.supervisor = ExtractionSupervisor(
+                workers=workers, job_timeout=job_timeout, cpu_timeout=cpu_timeout,
+                memory_limit=memory_limit, max_jobs_per_worker=max_jobs
+            )
+        self._supervisor_settings = settings
+        return self.supervisor
+
+    def _update_io_governors(self):
+        read_bps = parse_rate_limit(self.io_read_var.get())
+        write_bps = parse_rate_limit(self.io_write_var.get())
+        for governor in self.io_governors.values():
+            governor.set_limits(read_bps, write_bps)
+        return read_bps, write_bps
+
+    def apply_io_limits(self):
+        # Caps and ordering take effect on the running pipelines without a restart
+        read_bps, write_bps = self._update_io_governors()
+        if getattr(self, "handler", None):
+            self.handler.scheduler.set_order(self.schedule_order_var.get())
+        describe = lambda bps: f"{bps / (1024 * 1024):g} MB/s" if bps else "unlimited"
+        self.log(f"I/O limits applied: read {describe(read_bps)}, write {describe(write_bps)}, order {self.schedule_order_var.get()}.")
+        if self.monitor_var.get() and self.dest_var.get():
+            self.save_config()
+
     def toggle_startup(self):
         if self.startup_var.get():
             ok = create_startup_shortcut()
@@ -914,6 +3968,10 @@ class UnzipperGUI:
         if self.tray_icon:
             self.tray_icon.stop()
             self.tray_icon = None
+        if getattr(self, "supervisor", None) is not None:
+            self.supervisor.close()
+        if getattr(self, "leases", None) is not None:
+            self.leases.close()
         self.root.destroy()
 
     def on_close(self):
@@ -963,6 +4021,13 @@ class UnzipperGUI:
         logic_enabled = self.copy_logic_enabled_var.get()
         logic_input = self.copy_logic_var.get()
         copy_whole_folder = self.copy_whole_folder_var.get()
+        io_low_priority = self.io_low_priority_var.get()
+        schedule_order = self.schedule_order_var.get()
+        select_rules = self.select_rules_var.get()
+        advanced_settings = self._advanced_settings()
+        leases = self._get_leases(monitor_folder) if monitor_folder else None
+        self.in_flight = getattr(self, "in_flight", None) or InFlightRegistry()
+        in_flight = self.in_flight
         if not monitor_folder or not dest_folder:
             self.log("Both folders must be selected.")
             self.extract_all_btn.config(state=tk.NORMAL)
@@ -975,6 +4040,7 @@ class UnzipperGUI:
             return
 
         def do_extract():
+            handler = None
             try:
                 handler = ZipExtractorHandler(
                     monitor_folder, dest_folder,
@@ -985,11 +4051,21 @@ class UnzipperGUI:
                     copy_enabled=copy_enabled,
                     logic_input=logic_input,
                     logic_enabled=logic_enabled,
-                    copy_whole_folder=copy_whole_folder
+                    copy_whole_folder=copy_whole_folder,
+                    governor=self.io_governors["extract_all"],
+                    snapshot=self._get_snapshot(monitor_folder),
+                    in_flight=in_flight,
+                    select_rules=select_rules,
+                    progress_callback=self._on_job_progress,
+                    leases=leases,
+                    **advanced_settings
                 )
+                if io_low_priority:
+                    lower_io_priority()
                 archive_exts = handler.archive_exts
                 monitor_path = Path(monitor_folder)
                 archive_files = [f for f in monitor_path.iterdir() if f.is_file() and f.suffix.lower() in archive_exts]
+                archive_files.sort(key=lambda f: archive_sort_key(f, schedule_order))
                 if not archive_files:
                     self.log("No ZIP or RAR files found to extract.")
                     self.extract_all_btn.config(state=tk.NORMAL)
@@ -1003,16 +4079,17 @@ class UnzipperGUI:
                         break
                     ext = file_path.suffix.lower()
                     try:
-                        if ext == '.zip':
+                        if ext == '.zip' or (ext == '.rar' and rarfile):
                             if self._extract_all_stop_event.is_set():
                                 self.log(f"Stopped before extracting {file_path.name}.")
                                 break
-                            handler.extract_zip(file_path, stop_event=self._extract_all_stop_event)
-                        elif ext == '.rar' and rarfile:
-                            if self._extract_all_stop_event.is_set():
-                                self.log(f"Stopped before extracting {file_path.name}.")
-                                break
-                            handler.extract_rar(file_path, stop_event=self._extract_all_stop_event)
+                            if not in_flight.claim(file_path):
+                                self.log(f"Skipping {file_path.name}: it is already being extracted by the monitor.")
+                                continue
+                            try:
+                                handler.process_archive(file_path, stop_event=self._extract_all_stop_event)
+                            finally:
+                                in_flight.release(file_path)
                     except Exception as e:
                         self.log(f"Error extracting {file_path}: {e}")
                     if self._extract_all_stop_event.is_set():
@@ -1023,16 +4100,216 @@ class UnzipperGUI:
             except Exception as e:
                 self.log(f"Unexpected error during extraction: {e}")
             finally:
+                if handler is not None:
+                    handler.stop()
+                    if handler.isolation is not None:
+                        self.log(handler.isolation.report())
                 self.extract_all_btn.config(state=tk.NORMAL)
                 self.stop_extract_all_btn.config(state=tk.DISABLED)
 
         threading.Thread(target=do_extract, daemon=True).start()
 
+    def dry_run(self):
+        """Log what Extract All Existing would do with the current settings, touching nothing."""
+        monitor_folder = self.monitor_var.get()
+        dest_folder = self.dest_var.get()
+        if not monitor_folder or not Path(monitor_folder).exists():
+            self.log("Select an existing monitor folder first.")
+            return
+        handler = ZipExtractorHandler(
+            monitor_folder, dest_folder or monitor_folder,
+            delete_after_zip=self.delete_zip_var.get(),
+            delete_after_extracted=self.delete_extracted_var.get(),
+            file_exts=self.ext_var.get(),
+            copy_enabled=self.copy_enabled_var.get(),
+            logic_input=self.copy_logic_var.get(),
+            logic_enabled=self.copy_logic_enabled_var.get(),
+            copy_whole_folder=self.copy_whole_folder_var.get(),
+            schedule_order=self.schedule_order_var.get(),
+            select_rules=self.select_rules_var.get(),
+            create_target=False
+        )
+        self.dry_run_btn.config(state=tk.DISABLED)
+
+        def do_plan():
+            try:
+                started = time.perf_counter()
+                plans = handler.plan_folder()
+                for plan in plans:
+                    for line in plan.describe(limit=20):
+                        self.log(line)
+                total_copy = sum(plan.bytes_copied for plan in plans)
+                self.log(f"Dry run: {len(plans)} archive(s), {format_size(total_copy)} to copy, planned in {time.perf_counter() - started:.2f}s. Nothing was changed.")
+            except Exception as e:
+                self.log(f"Dry run failed: {e}")
+            finally:
+                self.dry_run_btn.config(state=tk.NORMAL)
+
+        threading.Thread(target=do_plan, daemon=True).start()
+
+    def _on_job_progress(self, info):
+        # Arrives from job threads at most a few times a second; the label is updated on the Tk thread
+        stage = info.get("stage")
+        if stage == "bytes":
+            total = info["total"]
+            percent = f" ({info['done'] * 100 / total:.0f}%)" if total else ""
+            name = Path(info["archive"]).name + ": " if info.get("archive") else ""
+            text = f"{name}{info['phase']} {format_size(info['done'])} of {format_size(total)}{percent}, {info['rate'] / (1024 * 1024):.1f} MB/s"
+        elif stage == "done":
+            text = ""
+        else:
+            return
+        self.root.after(0, self.progress_var.set, text)
+
+    def search_catalog(self, event=None):
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        if self.catalog is None:
+            self.log("The archive catalog is turned off (catalog=False in unzipper_config.txt).")
+            return
+        limit = 50
+        started = time.perf_counter()
+        try:
+            hits = self.catalog.search(query, limit=limit)
+        except sqlite3.Error as e:
+            self.log(f"Catalog search failed: {e}")
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        more = f" (showing the first {limit})" if len(hits) == limit else ""
+        self.log(f"Catalog search '{query}': {len(hits)} match(es) in {elapsed:.0f} ms{more}")
+        for hit in hits:
+            self.log(f"  {hit.name} ({format_size(hit.size or 0)}) from {hit.archive}" + (f" -> {hit.dest}" if hit.dest else ""))
+
     def stop_extract_all(self):
         self._extract_all_stop_event.set()
         self.log("Stopping extraction immediately...")
 
-def main():
+def main(argv=None):
+    import argparse
+    # Worker processes of a frozen (PyInstaller) build start here too
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Unzipper: extract archives from a monitored folder. Starts the GUI when run without options.")
+    parser.add_argument("--bench-deflate", nargs="+", metavar="ZIP_OR_FOLDER", help="compare the installed inflate backends on the given archives")
+    parser.add_argument("--plan", nargs="+", metavar="ARCHIVE_OR_FOLDER", help="dry run: print what processing these archives would do with the saved settings")
+    parser.add_argument("--dest", help="destination folder (overrides the saved config)")
+    parser.add_argument("--file-exts", help="extensions to copy, e.g. 'jpg, png' (overrides the saved config)")
+    parser.add_argument("--logic", help="priority logic, e.g. 'ai; png, eps' (overrides the saved config)")
+    parser.add_argument("--load-test", type=int, metavar="COUNT", help="simulate COUNT downloads into a temporary monitored folder and report delivery latency")
+    parser.add_argument("--rate", type=float, default=2.0, help="load test: average archives per second (default 2)")
+    parser.add_argument("--size-kb", type=int, default=1024, help="load test: archive size in KB (default 1024)")
+    parser.add_argument("--members", type=int, default=4, help="load test: files per archive (default 4)")
+    parser.add_argument("--mode", choices=LOAD_TEST_MODES, default="crdownload", help="load test: rename from .crdownload, or grow in place")
+    parser.add_argument("--grow-seconds", type=float, default=1.0, help="load test: how long each download takes to write (default 1)")
+    parser.add_argument("--isolated", action="store_true", help="load test: extract in a worker process")
+    parser.add_argument("--search", metavar="TEXT", help="look up archive members in the catalog by (part of) their path")
+    parser.add_argument("--headless", action="store_true", help="monitor --monitor without the GUI, sharing it with other instances through leases")
+    parser.add_argument("--monitor", help="headless: folder to monitor (overrides the saved config)")
+    parser.add_argument("--instance-id", help="headless: name of this instance in lease files (default: host name and process id)")
+    parser.add_argument("--lease-ttl", type=float, default=60, help="headless: seconds without a heartbeat before a lease is taken over (default 60)")
+    parser.add_argument("--duration", type=float, help="headless: stop after this many seconds")
+    parser.add_argument("--rules", help="selection rules, e.g. '*/renders/*.png >1MB; exclude __MACOSX/' (overrides the saved config)")
+    args = parser.parse_args(argv)
+    if args.headless:
+        config = read_config()
+        monitor_folder = args.monitor or config.get("monitor_folder")
+        dest_folder = args.dest or config.get("dest_folder")
+        if not monitor_folder or not dest_folder:
+            parser.error("--headless needs --monitor and --dest (or saved folders)")
+        leases = LeaseManager(monitor_folder, instance_id=args.instance_id, ttl=args.lease_ttl)
+        log = lambda msg: print(f"[{leases.instance_id}] {msg}", flush=True)
+        leases.log = log
+        cleanup = get_cleanup_queue()
+        if args.instance_id:
+            # Several instances may run from one install; each keeps its own pending deletions
+            safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in args.instance_id)
+            cleanup = CleanupQueue(path=CLEANUP_FILE.with_name(f"unzipper_cleanup-{safe_id}.json"))
+        cleanup.log = log
+        if cleanup.pending():
+            cleanup.start()
+        handler = ZipExtractorHandler(
+            monitor_folder, dest_folder,
+            delete_after_zip=config.get("delete_after_zip", "False").lower() == "true",
+            delete_after_extracted=config.get("delete_after_extracted", "False").lower() == "true",
+            file_exts=args.file_exts if args.file_exts is not None else config.get("file_exts", ""),
+            copy_enabled=args.file_exts is not None or config.get("copy_enabled", "True").lower() == "true",
+            logic_input=args.logic if args.logic is not None else config.get("logic_input", ""),
+            logic_enabled=args.logic is not None or config.get("logic_enabled", "False").lower() == "true",
+            copy_whole_folder=config.get("copy_whole_folder", "False").lower() == "true",
+            select_rules=args.rules if args.rules is not None else config.get("select_rules", ""),
+            gui_callback=log,
+            cleanup_queue=cleanup,
+            leases=leases
+        )
+        observer = Observer()
+        observer.schedule(handler, str(monitor_folder), recursive=False)
+        observer.start()
+        log(f"Monitoring {monitor_folder} (lease TTL {leases.ttl:g}s); {handler.enqueue_existing()} archive(s) already there.")
+        deadline = time.monotonic() + args.duration if args.duration else None
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
+            handler.stop()
+            leases.close()
+            log("Stopped.")
+        return
+    if args.load_test:
+        test = LoadTest(
+            count=args.load_test, rate=args.rate, size=args.size_kb * 1024, members=args.members,
+            mode=args.mode, grow_seconds=args.grow_seconds, isolated=args.isolated
+        )
+        print("\n".join(test.run().describe()))
+        return
+    if args.search:
+        catalog = ArchiveCatalog()
+        started = time.perf_counter()
+        hits = catalog.search(args.search)
+        elapsed = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            processed = time.strftime("%Y-%m-%d %H:%M", time.localtime(hit.processed))
+            print(f"{hit.name}\t{format_size(hit.size or 0)}\t{processed}\t{hit.archive}\t{hit.dest or '-'}")
+        print(f"{len(hits)} match(es) in {elapsed:.0f} ms.")
+        catalog.close()
+        return
+    if args.plan:
+        config = read_config()
+        file_exts = args.file_exts if args.file_exts is not None else config.get("file_exts", "")
+        logic_input = args.logic if args.logic is not None else config.get("logic_input", "")
+        select_rules = args.rules if args.rules is not None else config.get("select_rules", "")
+        started = time.perf_counter()
+        count = 0
+        for target in args.plan:
+            target = Path(target)
+            handler = ZipExtractorHandler(
+                target if target.is_dir() else target.parent,
+                args.dest or config.get("dest_folder") or ".",
+                delete_after_zip=config.get("delete_after_zip", "False").lower() == "true",
+                delete_after_extracted=config.get("delete_after_extracted", "False").lower() == "true",
+                file_exts=file_exts,
+                copy_enabled=args.file_exts is not None or config.get("copy_enabled", "True").lower() == "true",
+                logic_input=logic_input,
+                logic_enabled=args.logic is not None or config.get("logic_enabled", "False").lower() == "true",
+                copy_whole_folder=config.get("copy_whole_folder", "False").lower() == "true",
+                schedule_order=config.get("schedule_order", "fifo"),
+                select_rules=select_rules,
+                create_target=False
+            )
+            plans = handler.plan_folder() if target.is_dir() else [handler.plan_archive(target)]
+            for plan in plans:
+                print("\n".join(plan.describe()))
+            count += len(plans)
+        print(f"Planned {count} archive(s) in {time.perf_counter() - started:.2f}s; nothing was changed.")
+        return
+    if args.bench_deflate:
+        for name, (seconds, total) in benchmark_deflate_backends(args.bench_deflate).items():
+            rate = total / (1024 * 1024) / seconds if seconds else 0
+            print(f"{name:8} {total / (1024 * 1024):10.1f} MB in {seconds:7.2f}s  ({rate:.1f} MB/s)")
+        return
     root = tk.Tk()
     app = UnzipperGUI(root)
     app.start_monitoring()